@@ -1,6 +1,6 @@
 /* eslint-disable @typescript-eslint/no-explicit-any */
 // Service for communicating with the backend API
-import type { TraceHop } from '@/types/knowledgeBaseTypes';
+import type { RetrievedDocument, TraceHop } from '@/types/knowledgeBaseTypes';
 
 const DEFAULT_BACKEND = "http://127.0.0.1:8000";
 
@@ -114,6 +114,7 @@ export interface ExecutorAgent { // Exporting ExecutorAgent
   execution_time_ms?: number;
   // Knowledge base specific fields
   trace?: TraceHop[];
+  documents?: Record<string, RetrievedDocument>;
   num_hops?: number;
 }
 
@@ -193,6 +194,26 @@ export interface EditorHistory { // Exporting EditorHistory
   skipped: boolean;
 }
 
+/**
+ * Resolve a compact KB trace in place: sub-questions reference chunks by id in the
+ * executor's `documents` table, the UI expects them inline as `retrieved_docs`.
+ */
+export function expandCompactTrace(executorAgent?: ExecutorAgent): void {
+  const documents = executorAgent?.documents;
+  if (!executorAgent?.trace || !documents) {
+    return;
+  }
+  executorAgent.trace.forEach((hop) => {
+    hop.sub_questions?.forEach((subQuestion) => {
+      if (subQuestion.retrieved_doc_ids && !subQuestion.retrieved_docs) {
+        subQuestion.retrieved_docs = subQuestion.retrieved_doc_ids
+          .map((id) => documents[id])
+          .filter((doc): doc is RetrievedDocument => Boolean(doc));
+      }
+    });
+  });
+}
+
 /**
  * Send a query to the backend and return the response
  * @param query The user query to send to the backend
@@ -228,7 +249,8 @@ export async function callBackend(query: string, sessionId: string = "123"): Pro
       // Return the error response so the UI can handle it appropriately
       return data as ApiResponse;
     }
-    
+
+    expandCompactTrace(data.trace_info?.executor_agent);
     return data;
   } catch (error) {
     console.error('Error calling backend:', error);
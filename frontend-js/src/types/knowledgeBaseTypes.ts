@@ -49,6 +49,8 @@ export interface TraceHop {
 export interface SubQuestion {
   sub_question: string;
   retrieved_docs: RetrievedDocument[];
+  // Compact traces reference the executor's `documents` table instead of inlining docs
+  retrieved_doc_ids?: string[];
   global_summary: string;
   local_summary: string;
 }
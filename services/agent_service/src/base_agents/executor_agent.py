@@ -17,6 +17,8 @@ from ..utils.exceptions import (AgentServiceException, ExecutionError,
 from ..utils.logging import get_logger, setup_logger
 from ..utils.parsing import extract_json_with_regex, strip_markdown_code_fence, escape_unescaped_newlines_in_json_strings
 from ..utils.settings import settings, create_llm_client
+from ..utils.text_similarity import (mmr_select, pairwise_similarity_matrix,
+                                     split_sentences)
 from ..utils.token_tracker import token_tracker
 
 setup_logger()
@@ -162,16 +164,15 @@ class ExecutorAgent(RoutedAgent):
                 logger.info("Only one valid source present. Skipping aggregation, proceeding with single valid result.")
                 execution_time_ms = int((time.time() - start_time) * 1000)
 
-                # Extract optional KB trace
+                # Extract optional KB trace and the doc table its hops reference
                 kb_trace = only_result.get("trace") or None
+                kb_documents = only_result.get("documents") or None
                 kb_num_hops = only_result.get("num_hops") or None
 
+                # all_documents is not sent: it only repeats documents_by_source flattened
                 payload = {
                     "combined_answer_of_sources": only_result["answer"],
                     "executor_answer": only_result["answer"],
-                    "all_documents": [
-                        doc for docs in self._sources_documents.values() for doc in docs
-                    ],
                     "documents_by_source": self._sources_documents,
                     "metadata_by_source": self._sources_metadata,
                     "error": None,
@@ -181,6 +182,8 @@ class ExecutorAgent(RoutedAgent):
 
                 if kb_trace:
                     payload["trace"] = kb_trace
+                if kb_documents:
+                    payload["documents"] = kb_documents
                 if kb_num_hops:
                     payload["num_hops"] = kb_num_hops
 
@@ -203,7 +206,8 @@ class ExecutorAgent(RoutedAgent):
                 combined_execution_results = await self._combine_answer_from_sources(
                     plan["user_query"],
                     valid_results,
-                    strategy=execution_order.get("aggregation")
+                    strategy=execution_order.get("aggregation"),
+                    plan=plan
                 )
             except Exception as e:
                 logger.error(f"Error combining answers: {e}")
@@ -212,10 +216,6 @@ class ExecutorAgent(RoutedAgent):
                     details={"valid_sources": list(valid_results.keys())}
                 )
 
-            all_documents = [
-                doc for docs in self._sources_documents.values() for doc in docs
-            ]
-
             logger.info("Returning combined results.")
             execution_time_ms = int((time.time() - start_time) * 1000)
             return Message(
@@ -227,11 +227,11 @@ class ExecutorAgent(RoutedAgent):
                         "executor_answer": combined_execution_results[
                             "combined_answer_of_sources"
                         ],
-                        "all_documents": all_documents,
                         "documents_by_source": self._sources_documents,
                         "metadata_by_source": self._sources_metadata,
                         "error": None,
                         "llm_usage": combined_execution_results.get("llm_usage"),
+                        "aggregation": combined_execution_results.get("aggregation"),
                         "execution_time_ms": execution_time_ms
                     }
                 )
@@ -414,26 +414,115 @@ class ExecutorAgent(RoutedAgent):
                 answer = str(answer) if answer is not None else "No answer available"
             return {"combined_answer_of_sources": answer}
         
-        # Strategy 2: Simple concatenation of answers
-        answers = []
+        # Strategy 2: Extractive merge - pick the most relevant, least redundant
+        # sentences across all answers (MMR) and keep them grouped per source
+        candidates = []
         for qid, result in results.items():
             answer = result.get("answer", "")
-            if answer and answer.strip():
-                # Ensure each answer is a valid string
-                if not isinstance(answer, str):
-                    answer = str(answer)
-                answers.append(f"[Source {qid}]: {answer}")
-        
-        if answers:
-            combined = "\n\n".join(answers)
-            return {"combined_answer_of_sources": combined}
-        else:
+            if not isinstance(answer, str):
+                answer = str(answer) if answer is not None else ""
+            for position, sentence in enumerate(split_sentences(answer)):
+                candidates.append((qid, position, sentence))
+
+        if not candidates:
             return {"combined_answer_of_sources": "No valid answers found in any source"}
 
+        selected = mmr_select(
+            user_query,
+            [sentence for _, _, sentence in candidates],
+            k=settings.EXECUTOR_EXTRACTIVE_MAX_SENTENCES,
+        )
+
+        sentences_by_source: Dict[str, list] = {}
+        for idx in sorted(selected, key=lambda i: (candidates[i][0], candidates[i][1])):
+            qid, _, sentence = candidates[idx]
+            sentences_by_source.setdefault(qid, []).append(sentence)
+
+        answers = [
+            f"[Source {qid}]: {' '.join(sentences_by_source[qid])}"
+            for qid in results
+            if qid in sentences_by_source
+        ]
+        return {
+            "combined_answer_of_sources": "\n\n".join(answers),
+            "aggregation": {"method": "extractive_mmr", "sentences": len(selected)},
+        }
+
+    def _check_answer_agreement(
+        self, results: Dict[str, Any], strategy: Optional[str] = None, plan: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Compare source answers locally (term-vector cosine) to decide whether
+        they already agree closely enough to skip LLM aggregation.
+        Only parallel, independent sub-queries that ask the same question are
+        eligible: complementary or dependent sub-queries often share vocabulary
+        while each answer carries information the others lack.
+        The most central answer (highest total similarity to the others) is
+        reported as the best candidate.
+        """
+        qids = [
+            qid for qid, result in results.items()
+            if isinstance(result.get("answer"), str) and result["answer"].strip()
+        ]
+        threshold = settings.EXECUTOR_AGREEMENT_THRESHOLD
+        no_agreement = {"agreement": False, "similarity": 0.0, "threshold": threshold, "best_source": None}
+        if len(qids) < 2:
+            return no_agreement
+        if strategy != "parallel":
+            return {**no_agreement, "reason": f"strategy {strategy!r} is not parallel"}
+
+        plan = plan or {}
+        workflow = plan.get("execution_order", {}).get("workflow", [])
+        if any(step.get("dependencies") for step in workflow if step.get("query_id") in qids):
+            return {**no_agreement, "reason": "sub-queries depend on each other"}
+
+        sub_queries = {q["id"]: q.get("sub_query", "") for q in plan.get("query_components", [])}
+        question_matrix = pairwise_similarity_matrix([sub_queries.get(qid, "") for qid in qids])
+        question_similarity = min(
+            question_matrix[i][j] for i in range(len(qids)) for j in range(i + 1, len(qids))
+        )
+        if question_similarity < settings.EXECUTOR_SAME_QUESTION_THRESHOLD:
+            return {
+                **no_agreement,
+                "reason": "sub-queries ask different questions",
+                "question_similarity": round(question_similarity, 4),
+            }
+
+        answers = [results[qid]["answer"] for qid in qids]
+        matrix = pairwise_similarity_matrix(answers)
+        similarity = min(
+            matrix[i][j] for i in range(len(qids)) for j in range(i + 1, len(qids))
+        )
+        centrality = [sum(row) for row in matrix]
+        best = max(range(len(qids)), key=lambda i: (centrality[i], len(answers[i])))
+
+        return {
+            "agreement": similarity >= threshold,
+            "similarity": round(similarity, 4),
+            "threshold": threshold,
+            "best_source": qids[best],
+        }
+
     async def _combine_answer_from_sources(
-        self, user_query: str, results: Dict[str, Any], strategy: Optional[str] = None
+        self, user_query: str, results: Dict[str, Any], strategy: Optional[str] = None, plan: Optional[dict] = None
     ) -> Dict[str, Any]:
         try:
+            agreement = self._check_answer_agreement(results, strategy, plan)
+            if agreement["agreement"]:
+                logger.info(
+                    f"[Executor] Source answers agree (similarity={agreement['similarity']}), "
+                    f"using answer from {agreement['best_source']} without LLM aggregation"
+                )
+                return {
+                    "combined_answer_of_sources": results[agreement["best_source"]]["answer"],
+                    "llm_usage": None,
+                    "aggregation": {"method": "agreement_select", **agreement},
+                }
+            logger.info(
+                f"[Executor] Source answers not merged locally "
+                f"({agreement.get('reason') or 'similarity=' + str(agreement['similarity'])}), aggregating with LLM"
+            )
+
             # Filter out unnecessary fields that cause token limit issues
             filtered_results = {}
             for qid, result in results.items():
@@ -470,6 +559,8 @@ class ExecutorAgent(RoutedAgent):
                 logger.error(f"LLM call failed: {e}, using fallback")
                 return self._fallback_aggregation(user_query, results, strategy)
 
+            aggregation_info = {"method": "llm", **agreement}
+
             # Track token usage
             token_usage = token_tracker.track_completion("executor_agent", response, self.model)
 
@@ -511,6 +602,7 @@ class ExecutorAgent(RoutedAgent):
                 return {
                     "combined_answer_of_sources": result["answer"],
                     "llm_usage": llm_usage_obj.model_dump() if llm_usage_obj else None,
+                    "aggregation": aggregation_info,
                 }
             except Exception as e:
                 logger.error(f"Failed to parse structured JSON: {e}")
@@ -548,6 +640,7 @@ class ExecutorAgent(RoutedAgent):
                 return {
                     "combined_answer_of_sources": answer,
                     "llm_usage": llm_usage_obj.model_dump() if llm_usage_obj else None,
+                    "aggregation": aggregation_info,
                 }
 
         except AgentServiceException:
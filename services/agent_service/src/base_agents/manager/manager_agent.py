@@ -1,5 +1,5 @@
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 from autogen_core import AgentId, MessageContext, RoutedAgent, message_handler
 import time
 
@@ -9,8 +9,10 @@ from ...utils.exceptions import (EvaluationError,
                                  PlanningError,
                                 create_error_response,
                                 handle_agent_error)
+from ...utils.faq_index import faq_index
 from ...utils.logging import get_logger, setup_logger
 from ...utils.parsing import  safe_json_parse
+from ...utils.settings import settings
 from ...utils.token_tracker import token_tracker
 from ...base_agents.manager.manager_utils import run_evaluation_loop
 
@@ -68,6 +70,38 @@ class ManagerAgent(RoutedAgent):
                 session_id
             ][-5:]
 
+    async def _answer_from_faq(self, user_query: str, start_time: float) -> Optional[Dict]:
+        """Answer a close match of a precomputed FAQ entry, skipping planning and execution."""
+        try:
+            match = await faq_index.lookup(user_query)
+        except Exception as e:
+            logger.warning(f"[ManagerAgent] FAQ lookup failed: {e}")
+            return None
+        if not match:
+            return None
+
+        logger.info(
+            f"[ManagerAgent] Answering from FAQ entry '{match['question']}' (similarity {match['similarity']})")
+        self.trace_info.update({
+            'faq_match': {
+                'question': match['question'],
+                'similarity': match['similarity'],
+                'frequency': match['frequency'],
+                'eval_score': match['eval_score'],
+            },
+            'executor_agent': {
+                'executor_answer': match['answer'],
+                'documents_by_source': {'knowledgebase': match['sources']},
+                'metadata_by_source': {'knowledgebase': match['metadata']},
+                'error': None,
+            },
+            'final_answer': match['answer'],
+            'evaluation_skipped': True,
+            'skip_reason': "Answered from the precomputed FAQ index.",
+            'total_time': time.time() - start_time
+        })
+        return self.trace_info
+
     def _handle_planning_error(self, error: Exception, user_query: str, session_id: str) -> Message:
         """Handle planning phase errors with structured error handling."""
         logger.error(f"[ManagerAgent] Planning error: {error}")
@@ -163,6 +197,12 @@ class ManagerAgent(RoutedAgent):
         }
 
         try:
+            # A follow-up in an ongoing session may depend on the previous turn, which
+            # the FAQ answers (built for standalone questions) do not account for
+            if settings.FAQ_ENABLED and not context and await self._answer_from_faq(user_query, start_time):
+                self._update_history(session_id, message.content, self.trace_info['final_answer'])
+                return Message(content=json.dumps({'trace_info': self.trace_info}))
+
             # Initial plan generation
             logger.info(f"[PlannerAgent] Input: {user_query}")
             try:
@@ -224,8 +264,10 @@ class ManagerAgent(RoutedAgent):
                 self._update_history(session_id, message.content, self.trace_info['final_answer'])
                 return Message(content=json.dumps({'trace_info': self.trace_info}))
 
-            documents = q_output.get("all_documents", [])
             documents_by_source = q_output.get("documents_by_source", {})
+            documents = q_output.get("all_documents") or [
+                doc for docs in documents_by_source.values() for doc in docs
+            ]
             
             # Check if GitHub sources are used
             skip_evaluation = any(
@@ -0,0 +1,55 @@
+"""
+Small helpers shared by the benchmark scripts in this package.
+Run benchmarks from services/agent_service, e.g.:
+    python -m src.benchmarks.reranker_benchmark --help
+"""
+
+import json
+import math
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+def time_call(fn: Callable, *args, **kwargs):
+    """Run `fn` and return (result, elapsed_ms)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """p50 / p95 / mean latency in milliseconds."""
+    if not latencies_ms:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "mean_ms": 0.0}
+    arr = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+        "mean_ms": round(float(arr.mean()), 2),
+    }
+
+
+def ndcg_at_k(ranked_gains: Sequence[float], ideal_gains: Sequence[float], k: int) -> float:
+    """NDCG@k given the gains in ranked order and the full set of available gains."""
+    def dcg(gains):
+        return sum(g / math.log2(i + 2) for i, g in enumerate(list(gains)[:k]))
+
+    ideal = dcg(sorted(ideal_gains, reverse=True))
+    return dcg(ranked_gains) / ideal if ideal > 0 else 0.0
+
+
+def load_queries(path: str) -> List[dict]:
+    """Load benchmark queries from a JSONL file ({"query": ..., optional labels})."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_table(rows: List[Dict], columns: Sequence[str]) -> None:
+    """Print rows as a fixed-width table."""
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
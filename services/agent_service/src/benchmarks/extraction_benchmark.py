@@ -0,0 +1,116 @@
+"""
+Web page extraction benchmark: throughput and chunk count of the scraper's HTML
+extraction modes.
+
+  - full         : html2text over the whole page, uncapped (the original behaviour),
+  - main_content : readability-style boilerplate stripping, capped at --max-bytes.
+
+Each mode is run on the calling thread and in a process pool of --workers processes.
+Pages come from a directory of saved .html files or are downloaded once from --urls.
+Chunk counts use the web RAG splitter (SentenceSplitter, chunk_size=256), i.e. the number
+of chunks that would be embedded.
+
+    python -m src.benchmarks.extraction_benchmark (--html-dir pages/ | --urls urls.txt) \
+        [--workers 2] [--max-bytes 60000] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from ..source_agents.webrag_utils.extraction import extract_text
+from .bench_utils import print_table
+
+
+def load_html_dir(path: str) -> List[bytes]:
+    pages = []
+    for name in sorted(glob.glob(os.path.join(path, "*.htm*"))):
+        with open(name, "rb") as f:
+            pages.append(f.read())
+    return pages
+
+
+def download_pages(urls_file: str) -> List[bytes]:
+    from ..source_agents.webrag_utils.fetcher import AsyncPageFetcher
+
+    with open(urls_file, "r", encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    async def fetch_all():
+        fetcher = AsyncPageFetcher(max_bytes=5_000_000)
+        try:
+            return [r.content async for r in fetcher.iter_fetch(urls, deadline=60) if r.ok]
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(fetch_all())
+
+
+def count_chunks(texts: List[str]) -> int:
+    from llama_index.core import Document
+    from llama_index.core.node_parser import SentenceSplitter
+
+    splitter = SentenceSplitter(chunk_size=256)
+    return len(splitter.get_nodes_from_documents([Document(text=t) for t in texts if t]))
+
+
+def run_inline(pages, mode, max_bytes):
+    return [extract_text(page, mode, max_bytes) for page in pages]
+
+
+def run_pool(pool, pages, mode, max_bytes):
+    return list(pool.map(extract_text, pages, [mode] * len(pages), [max_bytes] * len(pages)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--html-dir", help="Directory of saved .html pages")
+    source.add_argument("--urls", help="Text file with one URL per line")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-bytes", type=int, default=60_000, help="Text cap per page (0 disables)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_html_dir(args.html_dir) if args.html_dir else download_pages(args.urls)
+    if not pages:
+        parser.error("No pages to benchmark")
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / 1e6:.1f} MB of HTML")
+
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    # Start the workers before timing
+    list(pool.map(extract_text, pages[:args.workers], ["main_content"] * args.workers))
+
+    rows = []
+    try:
+        for mode, max_bytes in (("full", 0), ("main_content", args.max_bytes)):
+            for runner in ("inline", f"pool x{args.workers}"):
+                elapsed = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    if runner == "inline":
+                        texts = run_inline(pages, mode, max_bytes)
+                    else:
+                        texts = run_pool(pool, pages, mode, max_bytes)
+                    elapsed.append(time.perf_counter() - start)
+                best = min(elapsed)
+                rows.append({
+                    "mode": mode,
+                    "runner": runner,
+                    "pages/s": round(len(pages) / best, 1),
+                    "text_kb/page": round(sum(len(t.encode("utf-8")) for t in texts) / len(pages) / 1024, 1),
+                    "chunks": count_chunks(texts),
+                })
+    finally:
+        pool.shutdown()
+
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
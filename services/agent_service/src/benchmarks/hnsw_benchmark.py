@@ -0,0 +1,144 @@
+"""
+HNSW benchmark: recall@k against exact (brute-force) search and query latency of the
+Chroma index at several corpus sizes and HNSW settings.
+
+Chunk embeddings are read from the KB Chroma index (or drawn at random with
+--synthetic). For each corpus size the vectors are loaded into a throwaway in-memory
+collection per (space, M, construction_ef) setting, then every search ef is timed.
+Corpus sizes larger than the KB are filled with jittered copies of real chunks so the
+neighbourhood structure stays realistic. Query vectors are the embedded benchmark
+queries plus held-out chunks.
+
+    python -m src.benchmarks.hnsw_benchmark --chroma-path <CHROMA_DB_PATH> \
+        [--sizes 1000,10000,50000] [--search-ef 10,32,64,128] [--m 16] [--k 15]
+"""
+
+import argparse
+import os
+import uuid
+
+import numpy as np
+
+from ..source_agents.kb_utils.vector_store import set_search_ef
+from .bench_utils import latency_summary, load_queries, print_table, time_call
+from .reranker_benchmark import DEFAULT_QUERIES
+
+
+def load_kb_embeddings(chroma_path: str) -> np.ndarray:
+    import chromadb
+
+    client = chromadb.PersistentClient(path=chroma_path)
+    collection = client.get_collection("langchain")
+    result = collection.get(include=["embeddings"])
+    return np.asarray(result["embeddings"], dtype=np.float32)
+
+
+def embed_queries(queries) -> np.ndarray:
+    from ..utils.embedding_registry import get_embedding_model
+
+    model = get_embedding_model("BAAI/bge-small-en-v1.5")
+    return model.encode([q["query"] for q in queries]).astype(np.float32)
+
+
+def build_corpus(base: np.ndarray, size: int, rng: np.random.Generator, jitter: float = 0.05) -> np.ndarray:
+    """`size` vectors: the base vectors first, then jittered copies of random base vectors."""
+    if size <= len(base):
+        return base[rng.choice(len(base), size, replace=False)]
+    extra = base[rng.integers(0, len(base), size - len(base))]
+    scale = jitter * np.linalg.norm(extra, axis=1, keepdims=True) / np.sqrt(base.shape[1])
+    extra = extra + rng.normal(size=extra.shape).astype(np.float32) * scale
+    return np.vstack([base, extra]).astype(np.float32)
+
+
+def exact_neighbours(corpus: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    """Indices of the true top-k neighbours under Chroma's distance for `space`."""
+    if space == "l2":
+        dist = (queries ** 2).sum(1)[:, None] - 2 * queries @ corpus.T + (corpus ** 2).sum(1)[None, :]
+    elif space == "ip":
+        dist = -(queries @ corpus.T)
+    else:  # cosine
+        qn = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        cn = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        dist = -(qn @ cn.T)
+    return np.argsort(dist, axis=1)[:, :k]
+
+
+def build_collection(client, corpus: np.ndarray, space: str, m: int, construction_ef: int, batch: int = 5000):
+    collection = client.create_collection(
+        name=f"bench-{uuid.uuid4().hex[:8]}",
+        metadata={"hnsw:space": space, "hnsw:M": m, "hnsw:construction_ef": construction_ef},
+    )
+    for start in range(0, len(corpus), batch):
+        end = min(start + batch, len(corpus))
+        collection.add(
+            ids=[str(i) for i in range(start, end)],
+            embeddings=corpus[start:end].tolist(),
+        )
+    return collection
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chroma-path", default=os.getenv("CHROMA_DB_PATH"))
+    parser.add_argument("--synthetic", action="store_true", help="Use random vectors instead of the KB index")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of synthetic vectors")
+    parser.add_argument("--queries", help="JSONL file with {query}")
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--space", default="l2", help="Comma separated: l2,cosine,ip")
+    parser.add_argument("--m", default="16", help="Comma separated HNSW M values")
+    parser.add_argument("--construction-ef", type=int, default=100)
+    parser.add_argument("--search-ef", default="10,32,64,128")
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--held-out", type=int, default=100, help="Chunk vectors used as extra queries")
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    import chromadb
+
+    rng = np.random.default_rng(args.seed)
+    if args.synthetic:
+        base = rng.normal(size=(5000, args.dim)).astype(np.float32)
+        query_vectors = rng.normal(size=(args.held_out, args.dim)).astype(np.float32)
+    else:
+        if not args.chroma_path:
+            parser.error("--chroma-path (or CHROMA_DB_PATH) is required unless --synthetic is set")
+        base = load_kb_embeddings(args.chroma_path)
+        queries = load_queries(args.queries) if args.queries else [{"query": q} for q in DEFAULT_QUERIES]
+        held_out = rng.choice(len(base), min(args.held_out, len(base) // 10), replace=False)
+        query_vectors = np.vstack([embed_queries(queries), base[held_out]])
+        base = np.delete(base, held_out, axis=0)
+
+    client = chromadb.EphemeralClient()
+    rows = []
+    for size in [int(s) for s in args.sizes.split(",")]:
+        corpus = build_corpus(base, size, rng)
+        for space in args.space.split(","):
+            truth = exact_neighbours(corpus, query_vectors, args.k, space)
+            for m in [int(v) for v in args.m.split(",")]:
+                collection = build_collection(client, corpus, space, m, args.construction_ef)
+                for ef in [int(v) for v in args.search_ef.split(",")]:
+                    set_search_ef(collection, ef)
+                    collection.query(query_embeddings=query_vectors[:1].tolist(), n_results=args.k)
+
+                    latencies, recalls = [], []
+                    for qv, true_ids in zip(query_vectors, truth):
+                        result, elapsed = time_call(
+                            collection.query, query_embeddings=[qv.tolist()], n_results=args.k)
+                        latencies.append(elapsed)
+                        found = {int(i) for i in result["ids"][0]}
+                        recalls.append(len(found & set(true_ids.tolist())) / args.k)
+
+                    rows.append({
+                        "corpus": size, "space": space, "M": m, "search_ef": ef,
+                        f"recall@{args.k}": round(float(np.mean(recalls)), 4),
+                        **latency_summary(latencies),
+                    })
+                client.delete_collection(collection.name)
+
+    print(f"{len(query_vectors)} queries, k={args.k}, construction_ef={args.construction_ef}, "
+          f"{'synthetic' if args.synthetic else 'KB'} vectors (dim {base.shape[1]})")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Reranker benchmark: latency and ranking quality of the KB reranker backends.
+
+For every query the top-k chunks are retrieved from the KB Chroma index, then scored by
+  - legacy : the original implementation (fp32, one batch padded to the longest pair,
+             no max_length),
+  - torch  : TorchReranker (fp32, length-bucketed batches, explicit max_length),
+  - onnx   : OnnxReranker (int8 ONNX Runtime, same batching).
+
+Quality is reported as NDCG@n against the legacy fp32 ranking and, when the query file
+carries "relevant_sources" labels, against those labels.
+
+    python -m src.benchmarks.reranker_benchmark --chroma-path <CHROMA_DB_PATH> \
+        [--queries queries.jsonl] [--threads 4] [--repeat 3]
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from ..source_agents.kb_utils.reranker import (DEFAULT_RERANKER_MODEL,
+                                                OnnxReranker, TorchReranker)
+from .bench_utils import latency_summary, load_queries, ndcg_at_k, print_table, time_call
+
+DEFAULT_QUERIES = [
+    "Which context expansion technique gave the best context precision?",
+    "How does sentence window retrieval compare to auto merging retrieval?",
+    "Which reranker performed best according to UpTrain?",
+    "What query optimization techniques were evaluated with LlamaIndex?",
+    "Compare semantic chunking and recursive chunking results",
+    "Which embedding model had the highest answer similarity on code files?",
+    "How was the multi-modal RAG pipeline for diagrams evaluated?",
+    "How does LlamaIndex route queries between PDF and tabular data?",
+]
+
+
+class LegacyReranker:
+    """The pre-backend reranker: a single batch padded to the longest pair."""
+
+    def __init__(self, model_name: str = DEFAULT_RERANKER_MODEL):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self._torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+
+    def score(self, query, texts):
+        inputs = self.tokenizer.batch_encode_plus(
+            [(query, t) for t in texts], padding=True, truncation=True, return_tensors="pt"
+        )
+        with self._torch.no_grad():
+            return self.model(**inputs).logits.view(-1).numpy()
+
+
+def retrieve_candidates(chroma_path: str, queries, k: int):
+    from langchain_community.vectorstores import Chroma
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    store = Chroma(
+        persist_directory=chroma_path,
+        embedding_function=HuggingFaceEmbeddings(model_name="BAAI/bge-small-en-v1.5"),
+    )
+    return [store.similarity_search(q["query"], k=k) for q in queries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chroma-path", default=os.getenv("CHROMA_DB_PATH"))
+    parser.add_argument("--queries", help="JSONL file with {query, relevant_sources?}")
+    parser.add_argument("--model", default=DEFAULT_RERANKER_MODEL)
+    parser.add_argument("--k", type=int, default=15, help="Candidates retrieved per query")
+    parser.add_argument("--top-n", type=int, default=5, help="Cutoff for NDCG")
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--onnx-dir", default="hf_cache/onnx")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backends", default="legacy,torch,onnx")
+    args = parser.parse_args()
+
+    if not args.chroma_path:
+        parser.error("--chroma-path (or CHROMA_DB_PATH) is required")
+
+    queries = load_queries(args.queries) if args.queries else [{"query": q} for q in DEFAULT_QUERIES]
+    candidates = retrieve_candidates(args.chroma_path, queries, args.k)
+
+    backends = {}
+    requested = args.backends.split(",")
+    if "legacy" in requested:
+        backends["legacy"] = LegacyReranker(args.model)
+    if "torch" in requested:
+        backends["torch"] = TorchReranker(args.model, args.max_length, args.batch_size, args.threads)
+    if "onnx" in requested:
+        backends["onnx"] = OnnxReranker(args.model, args.max_length, args.batch_size, args.threads, args.onnx_dir)
+
+    # Warm up every backend once so model/graph initialisation isn't timed
+    for backend in backends.values():
+        backend.score(queries[0]["query"], [d.page_content for d in candidates[0]])
+
+    reference = backends.get("legacy") or next(iter(backends.values()))
+    ref_scores = [reference.score(q["query"], [d.page_content for d in docs])
+                  for q, docs in zip(queries, candidates)]
+
+    rows = []
+    for name, backend in backends.items():
+        latencies, ndcg_ref, ndcg_labels = [], [], []
+        for q, docs, ref in zip(queries, candidates, ref_scores):
+            texts = [d.page_content for d in docs]
+            for _ in range(args.repeat):
+                scores, elapsed = time_call(backend.score, q["query"], texts)
+                latencies.append(elapsed)
+            order = np.argsort(-scores)
+
+            # Graded gains from the reference ranking: best reference chunk gets the highest gain
+            ref_rank = np.empty(len(ref), dtype=int)
+            ref_rank[np.argsort(-ref)] = np.arange(len(ref))
+            gains = np.maximum(args.top_n - ref_rank, 0).astype(float)
+            ndcg_ref.append(ndcg_at_k(gains[order], gains, args.top_n))
+
+            relevant = set(q.get("relevant_sources", []))
+            if relevant:
+                label_gains = np.array([
+                    1.0 if os.path.basename(str(d.metadata.get("source", ""))) in relevant else 0.0
+                    for d in docs
+                ])
+                ndcg_labels.append(ndcg_at_k(label_gains[order], label_gains, args.top_n))
+
+        row = {"backend": name, **latency_summary(latencies),
+               f"ndcg@{args.top_n}_vs_fp32": round(float(np.mean(ndcg_ref)), 4)}
+        if ndcg_labels:
+            row[f"ndcg@{args.top_n}_labels"] = round(float(np.mean(ndcg_labels)), 4)
+        rows.append(row)
+
+    columns = list(rows[0].keys())
+    for row in rows[1:]:
+        columns.extend(c for c in row if c not in columns)
+    print(f"{len(queries)} queries x {args.k} candidates, repeat={args.repeat}, threads={args.threads or 'default'}")
+    print_table(rows, columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Web RAG retrieval benchmark: latency and quality of the retrieval modes.
+
+  - hybrid : BM25 fused with MiniLM vector search (every chunk embedded),
+  - bm25   : BM25 only, no embeddings.
+
+Each query is paired with its own set of pages, as in a real web search: --pages-dir holds
+one sub-directory of saved .html files per query, named by the query's "id" in the
+queries file. Index time covers chunking and (for hybrid) embedding; the chunk store is
+disabled so every run embeds from scratch. Quality is measured as:
+  - agreement@5: overlap of the top-5 chunks with the hybrid top-5,
+  - hit@5: share of queries whose top-5 contains one of the query's "answers" strings
+    (only when the queries file carries them).
+The adaptive mode picks bm25 below WEBRAG_ADAPTIVE_EMBED_MIN_CHUNKS chunks and hybrid
+above, so its cost and quality per query follow from the two rows and the chunk counts.
+
+    python -m src.benchmarks.web_retrieval_benchmark --pages-dir pages/ --queries queries.jsonl \
+        [--repeat 3]
+
+queries.jsonl lines: {"id": "q1", "query": "...", "answers": ["optional", "strings"]}
+"""
+
+import argparse
+import glob
+import os
+
+import numpy as np
+
+from ..source_agents.webrag.webrag import RAG
+from ..source_agents.webrag_utils.data_scrapper import DataScraper
+from ..source_agents.webrag_utils.extraction import extract_text
+from .bench_utils import latency_summary, load_queries, print_table, time_call
+
+MODES = ["hybrid", "bm25"]
+
+
+def load_pages(pages_dir: str, query_id: str):
+    documents = []
+    for path in sorted(glob.glob(os.path.join(pages_dir, query_id, "*.htm*"))):
+        with open(path, "rb") as f:
+            text = extract_text(f.read(), "main_content", 60_000)
+        if text:
+            documents.append(DataScraper.make_document(f"file://{os.path.abspath(path)}", text))
+    return documents
+
+
+def run(mode: str, query: str, documents):
+    rag = RAG(use_chunk_store=False)
+    _, index_ms = time_call(rag.build_index, documents, retrieval_mode=mode)
+    contexts, query_ms = time_call(rag.query_index, query)
+    return contexts, index_ms, query_ms, len(rag.nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages-dir", required=True)
+    parser.add_argument("--queries", required=True)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    corpora = {q["id"]: load_pages(args.pages_dir, q["id"]) for q in queries}
+    queries = [q for q in queries if corpora[q["id"]]]
+    if not queries:
+        parser.error("No pages found for any query")
+
+    # Load the embedding model before timing
+    run("hybrid", queries[0]["query"], corpora[queries[0]["id"]])
+
+    results = {mode: {"index": [], "query": [], "top": {}, "hits": []} for mode in MODES}
+    chunk_counts = []
+    for q in queries:
+        documents = corpora[q["id"]]
+        for mode in MODES:
+            for _ in range(args.repeat):
+                contexts, index_ms, query_ms, chunks = run(mode, q["query"], documents)
+                results[mode]["index"].append(index_ms)
+                results[mode]["query"].append(query_ms)
+            results[mode]["top"][q["id"]] = contexts
+            if q.get("answers"):
+                text = "\n".join(contexts).lower()
+                results[mode]["hits"].append(any(a.lower() in text for a in q["answers"]))
+        chunk_counts.append(chunks)
+
+    rows = []
+    for mode in MODES:
+        agreement = [
+            len(set(results[mode]["top"][qid]) & set(results["hybrid"]["top"][qid])) / 5
+            for qid in results[mode]["top"]
+        ]
+        index_summary = latency_summary(results[mode]["index"])
+        rows.append({
+            "mode": mode,
+            "index_p50_ms": index_summary["p50_ms"],
+            "index_p95_ms": index_summary["p95_ms"],
+            "query_p50_ms": latency_summary(results[mode]["query"])["p50_ms"],
+            "agreement@5": round(float(np.mean(agreement)), 3),
+            "hit@5": round(float(np.mean(results[mode]["hits"])), 3) if results[mode]["hits"] else "-",
+        })
+
+    print(f"{len(queries)} queries, chunks per query: median {int(np.median(chunk_counts))}, "
+          f"max {max(chunk_counts)}")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
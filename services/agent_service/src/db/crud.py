@@ -3,7 +3,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 # Local application imports
 from .database import SessionLocal
-from .models import Conversation
+from .models import Conversation, FAQEntry
 
 
 def store_conversation(
@@ -57,3 +57,52 @@ def get_trace_history(session_id: str) -> List[Dict[str, Any]]:
     history = db.query(Conversation).filter(Conversation.session_id == session_id).all()
     db.close()
     return [h.trace_info for h in history if h.trace_info]
+
+
+def get_conversation_queries(limit: Optional[int] = None) -> List[str]:
+    """
+    Get stored user queries, most recent first.
+
+    Args:
+        limit: Maximum number of queries to return (all when None)
+
+    Returns:
+        List of query strings
+    """
+    db = SessionLocal()
+    q = db.query(Conversation.query).order_by(Conversation.timestamp.desc())
+    if limit:
+        q = q.limit(limit)
+    rows = q.all()
+    db.close()
+    return [row[0] for row in rows if row[0]]
+
+
+def replace_faq_entries(entries: List[Dict[str, Any]]) -> None:
+    """
+    Replace the whole FAQ table with freshly built entries.
+
+    Args:
+        entries: Dicts with the FAQEntry columns
+    """
+    db = SessionLocal()
+    db.query(FAQEntry).delete()
+    db.add_all([FAQEntry(**entry) for entry in entries])
+    db.commit()
+    db.close()
+
+
+def get_faq_entries(kb_index_version: str) -> List[FAQEntry]:
+    """
+    Get the FAQ entries built against a given KB index version.
+
+    Args:
+        kb_index_version: Current version of the KB Chroma index
+
+    Returns:
+        List of FAQEntry rows (entries for other versions are stale and skipped)
+    """
+    db = SessionLocal()
+    entries = db.query(FAQEntry).filter(FAQEntry.kb_index_version == kb_index_version).all()
+    db.close()
+    return entries
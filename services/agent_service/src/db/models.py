@@ -4,7 +4,7 @@ from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 # Third-party imports
-from sqlalchemy import JSON, Column, DateTime, Integer, String, Text
+from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, Text
 
 # Local application imports
 from .database import Base
@@ -20,6 +20,20 @@ class Conversation(Base):
     trace_info = Column(JSON)  # Store the complete trace information
 
 
+class FAQEntry(Base):
+    __tablename__ = "faq_entries"
+    id = Column(Integer, primary_key=True, index=True)
+    question = Column(Text)  # Representative question of the mined cluster
+    answer = Column(Text)
+    sources = Column(JSON)  # Source chunks the answer was generated from
+    source_metadata = Column(JSON)
+    embedding = Column(JSON)  # Normalized question embedding used for lookup
+    frequency = Column(Integer)  # Stored conversations in the cluster
+    eval_score = Column(Float)  # Fact-check score the answer passed
+    kb_index_version = Column(String, index=True)  # KB index the answer was built from
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
 class Message(BaseModel):
     """Base message model for agent communication."""
 
@@ -0,0 +1,168 @@
+"""
+Offline job building the precomputed FAQ index.
+
+1. Mine frequent questions from stored conversations: exact repeats are counted, then
+   near-duplicates are grouped greedily by embedding similarity (FAQ_CLUSTER_THRESHOLD).
+2. For each cluster seen at least FAQ_MIN_FREQUENCY times (at most FAQ_MAX_ENTRIES),
+   answer its most frequent phrasing with the KB agent and fact-check the answer against
+   its sources with the eval agent.
+3. Store answers scoring at least FAQ_MIN_EVAL_SCORE, with their sources, question
+   embedding and the current KB index version, replacing the previous FAQ table.
+
+Entries are keyed on the version marker the ingestion service writes next to the index.
+Run the job after every re-ingestion (entries built for an older index are never served):
+
+    python -m src.jobs.build_faq_index [--limit 5000] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import os
+from collections import Counter
+from typing import Any, Dict, List
+
+import numpy as np
+from autogen_core import AgentId, SingleThreadedAgentRuntime
+
+from ..base_agents.eval_agent import EvalAgent
+from ..db.crud import get_conversation_queries, replace_faq_entries
+from ..db.database import Base, engine
+from ..protocols.message import Message
+from ..protocols.schemas import EvalAgentInput, EvalAgentOutput, KBResponse
+from ..source_agents.kb_utils.index import IndexVersionTracker
+from ..source_agents.kb_utils.score_cache import normalize_query
+from ..source_agents.knowledgebase_agent import KBAgent
+from ..utils.embedding_registry import get_embedding_model
+from ..utils.faq_index import FAQ_EMBEDDING_MODEL
+from ..utils.logging import get_logger, setup_logger
+from ..utils.settings import settings
+
+setup_logger()
+logger = get_logger("FAQIndexJob")
+
+KB_AGENT_ID = AgentId("kb_agent", "default")
+EVAL_AGENT_ID = AgentId("eval_agent", "default")
+
+
+def mine_frequent_questions(queries: List[str], cluster_threshold: float, min_frequency: int,
+                            max_entries: int) -> List[Dict[str, Any]]:
+    """Group stored queries into clusters of near-duplicates, most frequent first."""
+    counts = Counter()
+    phrasing = {}
+    for query in queries:
+        key = normalize_query(query)
+        counts[key] += 1
+        phrasing.setdefault(key, query.strip())
+    if not counts:
+        return []
+
+    keys = [key for key, _ in counts.most_common()]
+    vectors = get_embedding_model(FAQ_EMBEDDING_MODEL).encode(
+        [phrasing[key] for key in keys], normalize=True)
+
+    clusters: List[Dict[str, Any]] = []
+    for key, vector in zip(keys, vectors):
+        for cluster in clusters:
+            if float(cluster["embedding"] @ vector) >= cluster_threshold:
+                cluster["frequency"] += counts[key]
+                cluster["variants"].append(phrasing[key])
+                break
+        else:
+            # Keys are visited by count, so the first phrasing is the cluster's most frequent
+            clusters.append({
+                "question": phrasing[key],
+                "embedding": vector,
+                "frequency": counts[key],
+                "variants": [phrasing[key]],
+            })
+
+    frequent = [c for c in clusters if c["frequency"] >= min_frequency]
+    frequent.sort(key=lambda c: c["frequency"], reverse=True)
+    return frequent[:max_entries]
+
+
+async def precompute_answers(clusters: List[Dict[str, Any]], kb_index_version: str,
+                             min_eval_score: float) -> List[Dict[str, Any]]:
+    """Answer each cluster with the KB agent and keep the answers that pass fact-checking."""
+    runtime = SingleThreadedAgentRuntime()
+    await KBAgent.register(runtime, "kb_agent", KBAgent)
+    await EvalAgent.register(runtime, "eval_agent", EvalAgent)
+    runtime.start()
+
+    entries = []
+    try:
+        for cluster in clusters:
+            question = cluster["question"]
+            response = await runtime.send_message(Message(content=question), KB_AGENT_ID)
+            kb = KBResponse.model_validate_json(response.content)
+            if kb.error or not kb.sources:
+                logger.warning(f"[FAQIndexJob] No KB answer for '{question}': {kb.error}")
+                continue
+
+            eval_input = EvalAgentInput(question=question, answer=kb.answer, contexts=kb.sources)
+            eval_response = await runtime.send_message(
+                Message(content=eval_input.model_dump_json()), EVAL_AGENT_ID)
+            evaluation = EvalAgentOutput.model_validate_json(eval_response.content)
+            if evaluation.error or evaluation.score < min_eval_score:
+                logger.info(
+                    f"[FAQIndexJob] Skipping '{question}': eval score {evaluation.score} < {min_eval_score}")
+                continue
+
+            logger.info(
+                f"[FAQIndexJob] FAQ entry '{question}' (frequency {cluster['frequency']}, score {evaluation.score})")
+            entries.append({
+                "question": question,
+                "answer": kb.answer,
+                "sources": kb.sources,
+                "source_metadata": kb.metadata,
+                "embedding": np.asarray(cluster["embedding"]).tolist(),
+                "frequency": cluster["frequency"],
+                "eval_score": float(evaluation.score),
+                "kb_index_version": kb_index_version,
+            })
+    finally:
+        await runtime.stop_when_idle()
+    return entries
+
+
+async def build_faq_index(limit: int = None, dry_run: bool = False) -> List[Dict[str, Any]]:
+    persist_directory = os.getenv("CHROMA_DB_PATH")
+    if not persist_directory:
+        raise ValueError("CHROMA_DB_PATH must be set to version FAQ entries against the KB index")
+
+    Base.metadata.create_all(bind=engine)
+    version_tracker = IndexVersionTracker(persist_directory, check_interval=0)
+    kb_index_version = version_tracker.current()
+
+    clusters = mine_frequent_questions(
+        get_conversation_queries(limit),
+        cluster_threshold=settings.FAQ_CLUSTER_THRESHOLD,
+        min_frequency=settings.FAQ_MIN_FREQUENCY,
+        max_entries=settings.FAQ_MAX_ENTRIES,
+    )
+    logger.info(f"[FAQIndexJob] {len(clusters)} frequent question clusters")
+    if dry_run:
+        for cluster in clusters:
+            print(f"{cluster['frequency']:>5}  {cluster['question']}  ({len(cluster['variants'])} variants)")
+        return []
+
+    entries = await precompute_answers(clusters, kb_index_version, settings.FAQ_MIN_EVAL_SCORE)
+
+    if version_tracker.current() != kb_index_version:
+        logger.warning("[FAQIndexJob] KB index changed while building the FAQ index; not storing entries")
+        return []
+    replace_faq_entries(entries)
+    logger.info(f"[FAQIndexJob] Stored {len(entries)} FAQ entries for KB index version {kb_index_version}")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="Only mine the most recent N conversations")
+    parser.add_argument("--dry-run", action="store_true", help="Print the mined clusters without answering them")
+    args = parser.parse_args()
+    asyncio.run(build_faq_index(limit=args.limit, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
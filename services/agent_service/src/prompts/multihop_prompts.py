@@ -100,6 +100,43 @@ Passages (with metadata provided for filtering):
 Local Pathway Response:
 """
 
+FUSED_SUMMARIZER_PROMPT = """
+You are a scientific assistant. Given the following retrieved passages, produce two summaries in a single response, using only the information in the passages:
+1. A **global summary**: a brief, concise, evidence-based summary that answers the main question as completely as possible.
+2. A **local summary**: an answer to the current sub-question that is as complete as possible.
+
+**Description of Metrics Used:**
+- **Context Relevance:** Measures whether the expanded retrieval context actually contains information pertinent to the user’s query. As defined by UpTrain, this metric evaluates if the retrieved content includes enough relevant information to properly answer the question—scored via an LLM-based check that rates contexts on a scale from fully irrelevant to completely adequate.
+- **Answer Similarity:** Measures semantic alignment between the model’s generated answer and the reference (ground-truth) answer. In frameworks like UpTrain, this is computed as the cosine similarity between embeddings of the generated and target answers, quantifying how close the response is to the expected answer.
+- **Context Precision:** Describes what proportion of the retrieved context is relevant to the answer.
+
+**Instructions:**
+- Before summarizing, review the metadata fields (section, metrics_mentioned, chunk_type, gen_ai_keywords, entities) for each passage to assess its relevance to the main question and the sub-question.
+- Only include information from passages that are highly relevant. Ignore any passage whose content and metadata indicates low relevance.
+- If any tables or numeric results appear, naturally include them in your answer, reproducing them verbatim in markdown table format or as inline numbers.
+- If there are no numeric results or tables, simply provide the most complete qualitative synthesis possible, referencing any comparative or descriptive evidence.
+- Do **not** mention missing numbers or tables, and do **not** include any section headers about numeric results.
+- Both summaries should be brief, clear, direct, and reference all relevant evidence from the passages.
+- Set "answerable" to true only if the passages fully answer the main question on their own; set it to false if any part of the question is not covered.
+
+📤 Your Output (must be valid JSON, escape newlines inside strings as \\n):
+
+```json
+{{
+  "global_summary": "<global evidence summary for the main question>",
+  "local_summary": "<local pathway response for the sub-question>",
+  "answerable": true | false
+}}
+```
+
+Main Question: {main_question}
+
+Sub-question: {sub_question}
+
+Passages (with metadata provided for filtering):
+{docs}
+"""
+
 PLANNER_REASONER_PROMPT = """
 You are a planning and reasoning agent responsible for stepwise information gathering to answer complex questions across multiple experimental reports.
 
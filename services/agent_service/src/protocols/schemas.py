@@ -59,6 +59,8 @@ class KBResponse(BaseModel):
     error: Optional[str] = None
     num_hops: int = 0
     trace: List[Dict[str, Any]] = []
+    # Chunk id -> {"content", "metadata"}; trace sub-questions reference it via "retrieved_doc_ids"
+    documents: Dict[str, Dict[str, Any]] = {}
 
 
 
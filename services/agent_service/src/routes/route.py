@@ -1,22 +1,54 @@
+import asyncio
 import json
 from typing import Any, Dict
 
 from fastapi import APIRouter, Query
 
+from ..db.crud import store_conversation
 from ..onboarding_team.team import send_to_agent
 from ..protocols.message import Message
+from ..source_agents.kb_utils.trace import expand_executor_output
+from ..utils.logging import get_logger, setup_logger
+from ..utils.settings import settings
+
+setup_logger()
+logger = get_logger("AgentServiceRoute")
 
 router = APIRouter(prefix="/1", tags=["Agent-service"])
 
 
 @router.post("/agent_service")
 async def invoke_agent_service(
-    query: str = Query(...), session_id: str = Query(...)
+    query: str = Query(...),
+    session_id: str = Query(...),
+    verbose_trace: bool = Query(
+        False, description="Inline retrieved documents in the KB trace instead of referencing a doc table"),
 ) -> Dict[str, Any]:
 
     response = await send_to_agent(Message(content=query))
     response_data = json.loads(response)
     if "trace_info" in response_data:
         response_data["trace_info"]["session_id"] = session_id
+        # Stored conversations feed the offline FAQ mining job. Answers served from the
+        # FAQ index are not stored, so they don't inflate their own question's frequency
+        try:
+            if not response_data["trace_info"].get("faq_match"):
+                await asyncio.to_thread(
+                    store_conversation, session_id, query,
+                    response_data["trace_info"].get("final_answer") or "", response_data["trace_info"])
+        except Exception as e:
+            logger.warning(f"Could not store conversation: {e}")
+        if verbose_trace:
+            expand_executor_output(response_data["trace_info"].get("executor_agent"))
 
     return response_data
+
+
+@router.get("/llm_key_metrics")
+async def llm_key_metrics() -> Dict[str, Any]:
+    """Per-key usage and last known rate limit headroom of the shared Groq key pool."""
+    if not settings.GROQ_KEY_POOL_ENABLED:
+        return {"enabled": False, "keys": []}
+    from ..utils.llm_key_pool import get_groq_key_pool
+
+    return {"enabled": True, "keys": get_groq_key_pool().metrics()}
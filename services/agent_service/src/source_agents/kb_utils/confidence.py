@@ -0,0 +1,51 @@
+"""
+Hop-1 confidence heuristic for the ReSP single-hop fast path.
+
+Combines the cross-encoder evidence (top reranker score and its margin over the runner-up,
+both mapped to probabilities with a sigmoid) with the summarizer's own assessment of
+whether the passages fully answer the question. A question is treated as conclusively
+answered by hop 1 when the combined confidence reaches the threshold and the summarizer
+did not report the evidence as insufficient.
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence
+
+TOP_SCORE_WEIGHT = 0.5
+MARGIN_WEIGHT = 0.15
+SELF_ASSESSMENT_WEIGHT = 0.35
+
+# A probability margin this large over the runner-up counts as a fully decisive top chunk
+MARGIN_SATURATION = 0.3
+
+
+def _sigmoid(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+def single_hop_confidence(rerank_scores: Sequence[float], self_assessment: Optional[bool],
+                          threshold: float) -> Dict[str, Any]:
+    """
+    Score how conclusive hop-1 evidence is.
+
+    `rerank_scores` are raw cross-encoder logits of the kept chunks; `self_assessment` is
+    the summarizer's "answerable" flag (None when it wasn't reported).
+    """
+    probs = sorted((_sigmoid(s) for s in rerank_scores), reverse=True)
+    top = probs[0] if probs else 0.0
+    margin = top - probs[1] if len(probs) > 1 else top
+    self_score = 0.5 if self_assessment is None else float(self_assessment)
+
+    confidence = (
+        TOP_SCORE_WEIGHT * top
+        + MARGIN_WEIGHT * min(1.0, margin / MARGIN_SATURATION)
+        + SELF_ASSESSMENT_WEIGHT * self_score
+    )
+    return {
+        "confidence": round(confidence, 4),
+        "threshold": threshold,
+        "top_score": round(top, 4),
+        "margin": round(margin, 4),
+        "self_assessment": self_assessment,
+        "conclusive": confidence >= threshold and self_assessment is not False,
+    }
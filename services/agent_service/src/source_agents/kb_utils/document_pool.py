@@ -0,0 +1,58 @@
+"""
+Per-request pool of KB chunks seen across ReSP hops, keyed by chunk id.
+
+Later hops mostly retrieve chunks an earlier sub-question already summarized. Those are
+not sent to the reranker again: they keep their best earlier score minus a penalty, so
+they only reach the summarizer prompt when nothing new outranks them. Chunks that were
+retrieved but never summarized are scored normally.
+"""
+
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .index import chunk_id
+
+
+class DocumentPool:
+    def __init__(self, summarized_penalty: float = 2.0):
+        """`summarized_penalty` is subtracted from the reranker logit of summarized chunks."""
+        self.summarized_penalty = summarized_penalty
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.reused = 0
+
+    def partition(self, docs: Sequence[Any]) -> Tuple[List[Any], List[Tuple[Any, float]]]:
+        """Split docs into (to_score, [(summarized doc, down-weighted score)])."""
+        to_score, summarized = [], []
+        with self._lock:
+            for doc in docs:
+                entry = self._entries.get(chunk_id(doc))
+                if entry and entry["summarized"]:
+                    summarized.append((doc, entry["score"] - self.summarized_penalty))
+                else:
+                    to_score.append(doc)
+            self.reused += len(summarized)
+        return to_score, summarized
+
+    def record_scores(self, docs: Sequence[Any], scores: Sequence[float]) -> None:
+        """Keep each chunk's best reranker score across the sub-questions that retrieved it."""
+        with self._lock:
+            for doc, score in zip(docs, scores):
+                entry = self._entries.setdefault(
+                    chunk_id(doc), {"score": float(score), "summarized": False})
+                entry["score"] = max(entry["score"], float(score))
+
+    def mark_summarized(self, docs: Sequence[Any]) -> None:
+        with self._lock:
+            for doc in docs:
+                entry = self._entries.setdefault(
+                    chunk_id(doc), {"score": 0.0, "summarized": False})
+                entry["summarized"] = True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "chunks": len(self._entries),
+                "summarized": sum(1 for e in self._entries.values() if e["summarized"]),
+                "reused_without_rerank": self.reused,
+            }
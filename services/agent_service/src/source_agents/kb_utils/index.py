@@ -0,0 +1,65 @@
+"""
+Helpers describing the persisted KB Chroma index: stable chunk identifiers and
+an index version that changes whenever the ingestion service writes to the index.
+
+The version is the marker the ingestion service writes next to the index after every
+ingested file. Reads and metadata changes by other processes never touch it, unlike
+the Chroma sqlite file, whose mtime and size are only used for indexes ingested
+before the marker existed.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+CHROMA_SQLITE_FILENAME = "chroma.sqlite3"
+INDEX_VERSION_FILENAME = "index_version.txt"  # written by the data ingestion service
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a chunk's text."""
+    return hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def chunk_id(doc) -> str:
+    """Stable identifier for a retrieved chunk: the Chroma id, falling back to a content hash."""
+    return getattr(doc, "id", None) or doc.metadata.get("id") or content_hash(doc.page_content)
+
+
+class IndexVersionTracker:
+    """
+    Cheap index version read from the ingestion marker file, falling back to the Chroma
+    sqlite file (mtime + size). It is only re-read once every `check_interval` seconds.
+    """
+
+    def __init__(self, persist_directory: str, check_interval: float = 30.0):
+        self.marker_path = os.path.join(persist_directory, INDEX_VERSION_FILENAME)
+        self.path = os.path.join(persist_directory, CHROMA_SQLITE_FILENAME)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+
+    def _read_version(self) -> str:
+        try:
+            with open(self.marker_path, "r", encoding="utf-8") as f:
+                marker = f.read().strip()
+            if marker:
+                return marker
+        except OSError:
+            pass
+        try:
+            stat = os.stat(self.path)
+            return f"{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            return "unknown"
+
+    def current(self) -> str:
+        """Return the current index version, refreshing it when the check interval elapsed."""
+        now = time.monotonic()
+        with self._lock:
+            if self._version is None or now - self._checked_at >= self.check_interval:
+                self._version = self._read_version()
+                self._checked_at = now
+            return self._version
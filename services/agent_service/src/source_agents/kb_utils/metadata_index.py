@@ -0,0 +1,168 @@
+"""
+Metadata index over the KB chunks (source document, section, page) and query routing.
+
+The data ingestion service writes `metadata_index.json` next to the Chroma index; if it
+is missing it is built once from the Chroma collection metadata. At query time
+`MetadataIndex.route()` detects references to a document or section name (and
+"page N") and returns a Chroma `where` filter restricting the vector search.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from ...utils.logging import get_logger, setup_logger
+
+setup_logger()
+logger = get_logger("KBMetadataIndex")
+
+METADATA_INDEX_FILENAME = "metadata_index.json"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PAGE_RE = re.compile(r"\bpage\s+(\d+)\b", re.IGNORECASE)
+_EXTENSION_RE = re.compile(r"\.(pdf|pptx)$", re.IGNORECASE)
+
+# Section titles this generic would match far too many questions
+_GENERIC_SECTIONS = {"introduction", "conclusion", "overview", "results", "summary", "references", "abstract"}
+
+
+def _tokens(text: str) -> List[str]:
+    """Lowercase word tokens with a naive plural strip ("rerankers" -> "reranker")"""
+    return [
+        tok[:-1] if len(tok) > 4 and tok.endswith("s") and not tok.endswith("ss") else tok
+        for tok in _TOKEN_RE.findall(_EXTENSION_RE.sub("", str(text)).lower())
+    ]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_tokens(text))
+
+
+class MetadataIndex:
+    def __init__(self, sources: Dict[str, Dict[str, Any]]):
+        """`sources` maps source name -> {"title": str|None, "sections": [str], "pages": [int]}"""
+        self.sources = sources
+
+        # Tokens that appear in most document names ("experimentation", "report", ...)
+        # carry no routing signal; keep only the distinctive ones per document.
+        name_tokens = {
+            name: set(_tokens(name)) | set(_tokens(info.get("title") or ""))
+            for name, info in sources.items()
+        }
+        doc_freq = Counter(tok for toks in name_tokens.values() for tok in toks)
+        cutoff = max(1, len(sources) // 2)
+        self._distinctive = {
+            name: {tok for tok in toks if doc_freq[tok] <= cutoff and len(tok) > 2}
+            for name, toks in name_tokens.items()
+        }
+
+        self._sections: Dict[str, set] = {}
+        for name, info in sources.items():
+            for section in info.get("sections", []):
+                norm = _normalize(section)
+                if len(norm.split()) >= 2 and norm not in _GENERIC_SECTIONS:
+                    self._sections.setdefault(norm, set()).add(section)
+
+    # ------------------------------------------------------------------ build/load
+    @staticmethod
+    def aggregate(metadatas: Iterable[Dict[str, Any]], sources: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Fold chunk metadata into the per-source {title, sections, pages} structure"""
+        sources = sources if sources is not None else {}
+        for meta in metadatas:
+            if not meta or not meta.get("source"):
+                continue
+            entry = sources.setdefault(meta["source"], {"title": None, "sections": [], "pages": []})
+            entry["title"] = entry.get("title") or meta.get("title")
+            section = meta.get("section") or meta.get("section_title")
+            if section and section not in entry["sections"]:
+                entry["sections"].append(section)
+            page = meta.get("page")
+            if isinstance(page, int) and page not in entry["pages"]:
+                entry["pages"].append(page)
+        return sources
+
+    @classmethod
+    def from_chroma(cls, collection) -> "MetadataIndex":
+        result = collection.get(include=["metadatas"])
+        return cls(cls.aggregate(result.get("metadatas") or []))
+
+    @classmethod
+    def load(cls, persist_directory: str, collection=None) -> Optional["MetadataIndex"]:
+        """Load the ingestion-time index, building it from Chroma when it doesn't exist yet"""
+        path = os.path.join(persist_directory, METADATA_INDEX_FILENAME)
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return cls(json.load(f).get("sources", {}))
+            if collection is None:
+                return None
+            logger.info("[KBMetadataIndex] No metadata index on disk, building it from Chroma")
+            index = cls.from_chroma(collection)
+        except Exception as e:
+            logger.warning(f"[KBMetadataIndex] Could not load metadata index: {e}")
+            return None
+
+        try:
+            index.save(persist_directory)
+        except Exception as e:
+            # e.g. a read-only CHROMA_DB_PATH; the index is rebuilt on the next start
+            logger.warning(f"[KBMetadataIndex] Could not save metadata index to {path}: {e}")
+        return index
+
+    def save(self, persist_directory: str) -> None:
+        path = os.path.join(persist_directory, METADATA_INDEX_FILENAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources}, f, indent=2)
+
+    # ------------------------------------------------------------------ routing
+    def match_sources(self, query: str, min_overlap: float = 0.6) -> List[str]:
+        """Documents whose distinctive name tokens are (mostly) mentioned in the query"""
+        query_tokens = set(_tokens(query))
+        matches = []
+        for name, distinctive in self._distinctive.items():
+            if not distinctive:
+                continue
+            hit = len(distinctive & query_tokens)
+            required = 1 if len(distinctive) == 1 else 2
+            if hit >= required and hit / len(distinctive) >= min_overlap:
+                matches.append(name)
+        return matches
+
+    def match_sections(self, query: str, sources: Optional[List[str]] = None) -> List[str]:
+        """Section titles quoted in the query, optionally limited to `sources`"""
+        norm_query = f" {_normalize(query)} "
+        allowed = None
+        if sources:
+            allowed = {s for name in sources for s in self.sources[name].get("sections", [])}
+        return [
+            section
+            for norm, originals in self._sections.items()
+            if f" {norm} " in norm_query
+            for section in originals
+            if allowed is None or section in allowed
+        ]
+
+    def route(self, query: str) -> Optional[Dict[str, Any]]:
+        """Chroma `where` filter for the document/section/page referenced by `query`, or None"""
+        clauses = []
+        sources = self.match_sources(query)
+        if sources:
+            clauses.append({"source": {"$in": sources}})
+
+        sections = self.match_sections(query, sources)
+        if sections:
+            # Older ingestions stored the header as "section_title"
+            clauses.append({"$or": [
+                {"section": {"$in": sections}},
+                {"section_title": {"$in": sections}},
+            ]})
+
+        page = _PAGE_RE.search(query)
+        if page and sources:
+            clauses.append({"page": int(page.group(1))})
+
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
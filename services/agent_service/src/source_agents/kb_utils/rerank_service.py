@@ -0,0 +1,108 @@
+"""
+Cross-request batching for the KB reranker.
+
+Every `rerank()` caller (concurrent sub-questions and concurrent requests alike) submits
+its (query, texts) job to a single `RerankService`. A worker thread collects jobs until
+`max_batch_pairs` pairs are queued or `max_wait_ms` has passed since the first one, runs
+one `score_pairs()` call over all of them and scatters the scores back to each job's
+future. Pairs are still length-bucketed inside the reranker, so mixing queries costs no
+extra padding.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from ...utils.logging import get_logger, setup_logger
+from .reranker import BaseReranker
+
+setup_logger()
+logger = get_logger("KBRerankService")
+
+
+@dataclass
+class _RerankJob:
+    query: str
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class RerankService:
+    def __init__(self, reranker: BaseReranker, max_batch_pairs: int = 64, max_wait_ms: float = 5.0):
+        self.reranker = reranker
+        self.max_batch_pairs = max_batch_pairs
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[_RerankJob]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+        self.pairs = 0
+        self._worker = threading.Thread(target=self._run, name="kb-rerank", daemon=True)
+        self._worker.start()
+
+    def _collect(self) -> List[_RerankJob]:
+        """Block for one job, then gather more until the size or latency limit is hit."""
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_pairs:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(job)
+            size += len(job.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            queries = [job.query for job in batch for _ in job.texts]
+            texts = [text for job in batch for text in job.texts]
+            try:
+                scores = self.reranker.score_pairs(queries, texts)
+            except Exception as e:
+                logger.error(f"[KBRerankService] Batched rerank failed: {e}")
+                for job in batch:
+                    job.future.set_exception(e)
+                continue
+
+            offset = 0
+            for job in batch:
+                job.future.set_result(scores[offset:offset + len(job.texts)])
+                offset += len(job.texts)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.jobs += len(batch)
+                self.pairs += len(texts)
+
+    def submit(self, query: str, texts: List[str]) -> Future:
+        """Queue a job; the future resolves to scores in `texts` order."""
+        job = _RerankJob(query=query, texts=list(texts))
+        if not job.texts:
+            job.future.set_result(np.zeros(0, dtype=np.float32))
+        else:
+            self._queue.put(job)
+        return job.future
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        """Blocking equivalent of `BaseReranker.score`, batched with concurrent callers."""
+        return self.submit(query, texts).result()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "jobs": self.jobs,
+                "pairs": self.pairs,
+                "avg_pairs_per_batch": round(self.pairs / self.batches, 2) if self.batches else 0.0,
+            }
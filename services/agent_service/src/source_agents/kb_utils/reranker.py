@@ -0,0 +1,180 @@
+"""
+Cross-encoder reranker backends for the knowledge base agent.
+
+Both backends share the same interface (`score(query, texts) -> np.ndarray`) and the
+same batching strategy: pairs are tokenized once, sorted by length and run in
+buckets, so each batch is only padded to its own longest pair (capped at
+`max_length`) instead of the longest pair overall.
+"""
+
+import os
+from typing import List, Sequence
+
+import numpy as np
+
+from ...utils.logging import get_logger, setup_logger
+
+setup_logger()
+logger = get_logger("KBReranker")
+
+DEFAULT_RERANKER_MODEL = "BAAI/bge-reranker-base"
+
+
+class BaseReranker:
+    """Tokenization and length-bucketed batching shared by all backends."""
+
+    def __init__(self, model_name: str = DEFAULT_RERANKER_MODEL, max_length: int = 512, batch_size: int = 16):
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    def _forward(self, batch: dict) -> np.ndarray:
+        """Return one relevance logit per row of an already padded batch."""
+        raise NotImplementedError
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        """Score every (query, text) pair; output order matches `texts`."""
+        return self.score_pairs([query] * len(texts), texts)
+
+    def score_pairs(self, queries: Sequence[str], texts: Sequence[str]) -> np.ndarray:
+        """Score (queries[i], texts[i]) pairs, which may mix several queries in one call."""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+
+        encoded = self.tokenizer(
+            list(queries),
+            list(texts),
+            truncation=True,
+            max_length=self.max_length,
+        )
+        features = [
+            {key: encoded[key][i] for key in encoded.keys()}
+            for i in range(len(texts))
+        ]
+        order = np.argsort([len(f["input_ids"]) for f in features], kind="stable")
+
+        scores = np.empty(len(texts), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            bucket = order[start:start + self.batch_size]
+            batch = self.tokenizer.pad(
+                [features[i] for i in bucket], padding="longest", return_tensors="np"
+            )
+            scores[bucket] = self._forward(batch)
+        return scores
+
+
+class TorchReranker(BaseReranker):
+    """fp32 PyTorch cross-encoder (reference implementation)."""
+
+    def __init__(self, model_name: str = DEFAULT_RERANKER_MODEL, max_length: int = 512,
+                 batch_size: int = 16, num_threads: int = 0):
+        super().__init__(model_name, max_length, batch_size)
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self._torch = torch
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+
+    def _forward(self, batch: dict) -> np.ndarray:
+        inputs = {k: self._torch.from_numpy(v) for k, v in batch.items()}
+        with self._torch.no_grad():
+            logits = self.model(**inputs).logits
+        return logits.view(-1).float().numpy()
+
+
+class OnnxReranker(BaseReranker):
+    """
+    int8 dynamically quantized cross-encoder on ONNX Runtime.
+    The quantized graph is exported once into `onnx_dir` and reused afterwards.
+    """
+
+    FP32_FILENAME = "model.onnx"
+    INT8_FILENAME = "model.int8.onnx"
+
+    def __init__(self, model_name: str = DEFAULT_RERANKER_MODEL, max_length: int = 512,
+                 batch_size: int = 16, num_threads: int = 0, onnx_dir: str = "hf_cache/onnx"):
+        super().__init__(model_name, max_length, batch_size)
+        import onnxruntime as ort
+
+        model_dir = os.path.join(onnx_dir, model_name.replace("/", "--"))
+        model_path = os.path.join(model_dir, self.INT8_FILENAME)
+        if not os.path.exists(model_path):
+            self._export_quantized(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        logger.info(f"[KBReranker] Loaded quantized ONNX reranker from {model_path}")
+
+    def _export_quantized(self, model_dir: str) -> None:
+        """Export the HF model to ONNX and apply dynamic int8 weight quantization."""
+        import torch
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        from transformers import AutoModelForSequenceClassification
+
+        os.makedirs(model_dir, exist_ok=True)
+        fp32_path = os.path.join(model_dir, self.FP32_FILENAME)
+        int8_path = os.path.join(model_dir, self.INT8_FILENAME)
+        logger.info(f"[KBReranker] Exporting {self.model_name} to ONNX at {model_dir}")
+
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        model.eval()
+        dummy = self.tokenizer(["query"], ["document"], return_tensors="pt")
+        dynamic_axes = {"input_ids": {0: "batch", 1: "sequence"},
+                        "attention_mask": {0: "batch", 1: "sequence"},
+                        "logits": {0: "batch"}}
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (dummy["input_ids"], dummy["attention_mask"]),
+                fp32_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+            )
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+
+    def _forward(self, batch: dict) -> np.ndarray:
+        feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self.input_names}
+        logits = self.session.run(["logits"], feeds)[0]
+        return logits.reshape(-1).astype(np.float32)
+
+
+RERANKER_BACKENDS = {
+    "torch": TorchReranker,
+    "onnx": OnnxReranker,
+}
+
+
+def create_reranker(backend: str = "torch", **kwargs) -> BaseReranker:
+    """Instantiate a reranker backend by name ('torch' or 'onnx')."""
+    try:
+        backend_cls = RERANKER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown reranker backend '{backend}'. Available: {list(RERANKER_BACKENDS)}")
+    if backend_cls is not OnnxReranker:
+        kwargs.pop("onnx_dir", None)
+    return backend_cls(**kwargs)
+
+
+def top_n_indices(scores: np.ndarray, top_n: int = None) -> List[int]:
+    """Indices of the highest scores in descending order, optionally cut at `top_n`."""
+    order = np.argsort(-scores, kind="stable")
+    if top_n is not None:
+        order = order[:top_n]
+    return order.tolist()
@@ -0,0 +1,68 @@
+"""
+Bounded LRU cache of cross-encoder logits keyed by (normalized query hash, chunk id).
+The whole cache is dropped when the KB index version changes.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share entries."""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+class RerankScoreCache:
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._index_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self, index_version: Optional[str]) -> None:
+        # Must be called with the lock held
+        if index_version != self._index_version:
+            self._entries.clear()
+            self._index_version = index_version
+
+    def get_many(self, query: str, chunk_ids: Sequence[str], index_version: Optional[str] = None) -> List[Optional[float]]:
+        """Cached scores in `chunk_ids` order, None where the pair hasn't been scored yet."""
+        qh = query_hash(query)
+        scores: List[Optional[float]] = []
+        with self._lock:
+            self._check_version(index_version)
+            for cid in chunk_ids:
+                key = (qh, cid)
+                score = self._entries.get(key)
+                if score is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                scores.append(score)
+        return scores
+
+    def put_many(self, query: str, scores: Dict[str, float], index_version: Optional[str] = None) -> None:
+        """Store {chunk_id: score} for `query`, evicting least recently used entries."""
+        qh = query_hash(query)
+        with self._lock:
+            self._check_version(index_version)
+            for cid, score in scores.items():
+                key = (qh, cid)
+                self._entries[key] = float(score)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,73 @@
+"""
+Per-request memory of answered ReSP sub-questions for semantic de-duplication.
+
+The reasoner often proposes a rephrasing of a sub-question that was already answered.
+New sub-questions are embedded and compared (cosine) with every answered one and with
+the ones already accepted for the next hop; above the threshold they are merged into the
+earlier question instead of paying for another retrieval, rerank and summary round.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EmbedFn = Callable[[Sequence[str]], Awaitable[List[List[float]]]]
+
+
+class SubQuestionMemory:
+    def __init__(self, embed_fn: EmbedFn, threshold: float = 0.9):
+        """`embed_fn` must return L2-normalized vectors so dot products are cosines."""
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self._questions: List[str] = []
+        self._summaries: List[Optional[str]] = []
+        self._vectors: List[Optional[np.ndarray]] = []
+
+    def add_answered(self, question: str, local_summary: str) -> None:
+        """Remember an answered sub-question (embedded lazily, in the next batch)."""
+        self._questions.append(question)
+        self._summaries.append(local_summary)
+        self._vectors.append(None)
+
+    async def _embed_pending(self, candidates: Sequence[str]) -> np.ndarray:
+        pending = [i for i, vec in enumerate(self._vectors) if vec is None]
+        vectors = np.asarray(
+            await self.embed_fn([self._questions[i] for i in pending] + list(candidates)),
+            dtype=np.float32)
+        for i, vec in zip(pending, vectors):
+            self._vectors[i] = vec
+        return vectors[len(pending):]
+
+    async def filter_new(self, candidates: Sequence[str]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Split candidates into (kept, merges). A merge records the candidate, the earlier
+        question it duplicates, their similarity and, when that question was already
+        answered, the local summary reused for it.
+        """
+        candidates = [q for q in candidates if q]
+        if not candidates:
+            return [], []
+
+        vectors = await self._embed_pending(candidates)
+        known_questions = list(self._questions)
+        known_summaries = list(self._summaries)
+        known = np.stack(self._vectors) if self._vectors else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+        kept, merges = [], []
+        for question, vec in zip(candidates, vectors):
+            sims = known @ vec if len(known) else np.zeros(0, dtype=np.float32)
+            best = int(np.argmax(sims)) if len(sims) else -1
+            if best >= 0 and sims[best] >= self.threshold:
+                merges.append({
+                    "sub_question": question,
+                    "merged_into": known_questions[best],
+                    "similarity": round(float(sims[best]), 4),
+                    "reused_local_summary": known_summaries[best],
+                })
+                continue
+            kept.append(question)
+            # Accepted candidates also absorb later near-duplicates from the same batch
+            known_questions.append(question)
+            known_summaries.append(None)
+            known = np.vstack([known, vec[None, :]])
+        return kept, merges
@@ -0,0 +1,60 @@
+"""
+Compact, reference-based KB trace.
+
+Each retrieved chunk is stored once in a document table keyed by chunk id and the hops
+only reference those ids (`retrieved_doc_ids`), instead of repeating content and
+metadata for every sub-question of every hop. `expand_trace` restores the verbose
+`retrieved_docs` form for callers that ask for it.
+"""
+
+import copy
+from typing import Any, Dict, List
+
+from .index import chunk_id
+
+
+def add_documents(documents: Dict[str, Dict[str, Any]], docs) -> List[str]:
+    """Register langchain documents in the doc table and return their ids in order."""
+    ids = []
+    for doc in docs:
+        cid = chunk_id(doc)
+        if cid not in documents:
+            documents[cid] = {"content": doc.page_content, "metadata": dict(doc.metadata)}
+        ids.append(cid)
+    return ids
+
+
+def iter_doc_ids(trace: List[Dict[str, Any]]):
+    """Yield every referenced chunk id in trace order (with repeats)."""
+    for hop_info in trace:
+        for subq_info in hop_info.get("sub_questions", []):
+            yield from subq_info.get("retrieved_doc_ids", [])
+
+
+def expand_trace(trace: List[Dict[str, Any]], documents: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Verbose copy of a compact trace, with `retrieved_docs` resolved from the doc table."""
+    expanded = copy.deepcopy(trace)
+    for hop_info in expanded:
+        for subq_info in hop_info.get("sub_questions", []):
+            ids = subq_info.pop("retrieved_doc_ids", None)
+            if ids is not None:
+                subq_info["retrieved_docs"] = [documents[cid] for cid in ids if cid in documents]
+    return expanded
+
+
+def expand_executor_output(executor_output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Restore the verbose executor payload in place: KB trace with inline documents (doc table
+    dropped) and the flattened `all_documents` list.
+    """
+    if not isinstance(executor_output, dict):
+        return executor_output
+    documents = executor_output.pop("documents", None)
+    if documents is not None and executor_output.get("trace"):
+        executor_output["trace"] = expand_trace(executor_output["trace"], documents)
+    documents_by_source = executor_output.get("documents_by_source") or {}
+    if "all_documents" not in executor_output:
+        executor_output["all_documents"] = [
+            doc for docs in documents_by_source.values() for doc in docs
+        ]
+    return executor_output
@@ -0,0 +1,97 @@
+"""
+Shared persistent Chroma client and HNSW parameters for the KB index.
+
+Index-time parameters (distance metric, M, construction ef) only take effect when the
+collection is created, i.e. at ingestion; the data ingestion service reads the same
+CHROMA_HNSW_* variables. The search-time `ef` can change on an existing collection: the
+agent applies CHROMA_HNSW_SEARCH_EF when it opens the store, if the collection differs.
+That write doesn't invalidate caches, which are keyed on the ingestion version marker
+(see kb_utils/index.py), not on the Chroma files.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from ...utils.logging import get_logger, setup_logger
+
+setup_logger()
+logger = get_logger("KBVectorStore")
+
+DEFAULT_COLLECTION_NAME = "langchain"  # langchain's Chroma default, used by ingestion
+DEFAULT_SEARCH_EF = 64  # Chroma's own default of 10 is below the 15 chunks we retrieve
+
+
+def hnsw_metadata(space: str = "l2", m: int = 16, construction_ef: int = 100,
+                  search_ef: int = DEFAULT_SEARCH_EF) -> Dict[str, Any]:
+    """Chroma collection metadata carrying the HNSW parameters."""
+    return {
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+        "hnsw:search_ef": search_ef,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_chroma_client(persist_directory: str):
+    """One persistent Chroma client per index directory for the whole process."""
+    import chromadb
+
+    return chromadb.PersistentClient(path=persist_directory)
+
+
+def current_search_ef(collection) -> Optional[int]:
+    """Query-time HNSW ef of a collection, from its configuration or legacy metadata."""
+    try:
+        ef = (collection.configuration or {}).get("hnsw", {}).get("ef_search")
+        if ef is not None:
+            return ef
+    except Exception:
+        pass
+    return (collection.metadata or {}).get("hnsw:search_ef")
+
+
+def set_search_ef(collection, search_ef: int) -> bool:
+    """Change the query-time HNSW ef of an existing collection; returns False if unsupported."""
+    try:
+        collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+        return True
+    except Exception as e:
+        logger.debug(f"[KBVectorStore] configuration update not supported ({e}), trying metadata")
+    try:
+        metadata = dict(collection.metadata or {})
+        metadata["hnsw:search_ef"] = search_ef
+        collection.modify(metadata=metadata)
+        return True
+    except Exception as e:
+        logger.warning(f"[KBVectorStore] Could not set hnsw search_ef={search_ef}: {e}")
+        return False
+
+
+def get_vector_store(persist_directory: str, embedding_model, space: str = "l2", m: int = 16,
+                     construction_ef: int = 100, search_ef: int = DEFAULT_SEARCH_EF,
+                     collection_name: str = DEFAULT_COLLECTION_NAME):
+    """
+    LangChain Chroma store over the shared client. space/M/construction_ef are only used
+    when the collection does not exist yet; `search_ef` is also applied to an existing one.
+    """
+    from langchain_community.vectorstores import Chroma
+
+    client = get_chroma_client(persist_directory)
+    try:
+        client.get_collection(collection_name)
+        collection_metadata = None
+    except Exception:
+        collection_metadata = hnsw_metadata(space, m, construction_ef, search_ef)
+
+    vector_store = Chroma(
+        client=client,
+        collection_name=collection_name,
+        embedding_function=embedding_model,
+        collection_metadata=collection_metadata,
+    )
+    collection = vector_store._collection
+    current = current_search_ef(collection)
+    if current != search_ef and set_search_ef(collection, search_ef):
+        logger.info(f"[KBVectorStore] hnsw search_ef set to {search_ef} (was {current})")
+    return vector_store
@@ -2,39 +2,83 @@ import asyncio
 import json
 import os
 import re
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+import numpy as np
 from autogen_core import MessageContext, RoutedAgent, message_handler
 from openai import OpenAI
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-from ..prompts.multihop_prompts import GENERATOR_PROMPT, GLOBAL_SUMMARIZER_PROMPT, LOCAL_SUMMARIZER_PROMPT, PLANNER_REASONER_PROMPT, GENIE_DOCS_TOC
+from ..prompts.multihop_prompts import GENERATOR_PROMPT, GLOBAL_SUMMARIZER_PROMPT, LOCAL_SUMMARIZER_PROMPT, FUSED_SUMMARIZER_PROMPT, PLANNER_REASONER_PROMPT, GENIE_DOCS_TOC
 from ..protocols.message import Message
 from ..utils.logging import get_logger, setup_logger
+from ..utils.embedding_registry import RegistryLangchainEmbeddings, embed
+from ..utils.parsing import escape_unescaped_newlines_in_json_strings, safe_json_parse, strip_markdown_code_fence
 from ..protocols.schemas import KBResponse
-from ..utils.settings import create_llm_client, create_light_llm_client
+from ..utils.settings import create_llm_client, create_light_llm_client, settings
+from .kb_utils.confidence import single_hop_confidence
+from .kb_utils.document_pool import DocumentPool
+from .kb_utils.index import IndexVersionTracker, chunk_id
+from .kb_utils.metadata_index import MetadataIndex
+from .kb_utils.rerank_service import RerankService
+from .kb_utils.reranker import create_reranker, top_n_indices
+from .kb_utils.score_cache import RerankScoreCache
+from .kb_utils.subquestion_memory import SubQuestionMemory
+from .kb_utils.trace import add_documents, iter_doc_ids
+from .kb_utils.vector_store import get_vector_store
 
 setup_logger()
 logger = get_logger("KBAgent")
 
-# Load reranker model
-tokenizer = AutoTokenizer.from_pretrained("BAAI/bge-reranker-base")
-reranker = AutoModelForSequenceClassification.from_pretrained(
-    "BAAI/bge-reranker-base")
 
+@lru_cache(maxsize=1)
+def get_reranker():
+    """Load the configured cross-encoder reranker backend once per process"""
+    return create_reranker(
+        settings.KB_RERANKER_BACKEND,
+        model_name=settings.KB_RERANKER_MODEL,
+        max_length=settings.KB_RERANKER_MAX_LENGTH,
+        batch_size=settings.KB_RERANKER_BATCH_SIZE,
+        num_threads=settings.KB_RERANKER_THREADS,
+        onnx_dir=settings.KB_RERANKER_ONNX_DIR,
+    )
 
-def rerank(query, docs):
-    """Rerank documents using BGE reranker"""
-    if not docs:
-        return []
-    pairs = [(query, doc.page_content) for doc in docs]
-    inputs = tokenizer.batch_encode_plus(
-        pairs, padding=True, truncation=True, return_tensors="pt"
+
+@lru_cache(maxsize=1)
+def get_rerank_service() -> RerankService:
+    """Process-wide rerank service batching jobs from all concurrent callers"""
+    return RerankService(
+        get_reranker(),
+        max_batch_pairs=settings.KB_RERANK_BATCH_MAX_PAIRS,
+        max_wait_ms=settings.KB_RERANK_BATCH_MAX_WAIT_MS,
     )
-    with torch.no_grad():
-        scores = reranker(**inputs).logits.squeeze()
-    return [doc for _, doc in sorted(zip(scores, docs), key=lambda x: x[0], reverse=True)]
+
+
+rerank_score_cache = RerankScoreCache(max_entries=settings.KB_RERANK_CACHE_SIZE)
+
+
+def rerank(query, docs, top_n=None, index_version=None, return_scores=False):
+    """
+    Rerank documents with the cross-encoder, keeping at most `top_n`.
+    With `return_scores` a (docs, scores) tuple is returned, scores aligned with docs.
+    Scores are cached per (query, chunk id); only uncached pairs reach the model, through
+    the shared rerank service so concurrent callers share forward passes.
+    """
+    if not docs:
+        return ([], []) if return_scores else []
+    ids = [chunk_id(doc) for doc in docs]
+    cached = rerank_score_cache.get_many(query, ids, index_version)
+    missing = [i for i, score in enumerate(cached) if score is None]
+    if missing:
+        fresh = get_rerank_service().score(query, [docs[i].page_content for i in missing])
+        rerank_score_cache.put_many(
+            query, {ids[i]: score for i, score in zip(missing, fresh)}, index_version)
+        for i, score in zip(missing, fresh):
+            cached[i] = float(score)
+    scores = np.asarray(cached, dtype=np.float32)
+    order = top_n_indices(scores, top_n)
+    if return_scores:
+        return [docs[i] for i in order], [float(scores[i]) for i in order]
+    return [docs[i] for i in order]
 
 
 def boost_by_metadata(query, docs):
@@ -50,25 +94,43 @@ def boost_by_metadata(query, docs):
     )
 
 
-def get_embedding_model() -> HuggingFaceEmbeddings:
-    """Get the embedding model"""
-    return HuggingFaceEmbeddings(model_name="BAAI/bge-small-en-v1.5")
+def get_embedding_model() -> RegistryLangchainEmbeddings:
+    """Get the embedding model (shared process-wide through the embedding registry)"""
+    return RegistryLangchainEmbeddings("BAAI/bge-small-en-v1.5")
 
 
-def get_chroma_retriever(persist_directory, embedding_model, k=15):
-    """Get Chroma retriever"""
-    vector_store = Chroma(
-        persist_directory=persist_directory,
-        embedding_function=embedding_model,
+def get_chroma_retriever(persist_directory, embedding_model, k=15, where=None):
+    """
+    Get Chroma retriever over the shared persistent client, with the configured HNSW
+    parameters, optionally restricted by a Chroma `where` metadata filter
+    """
+    vector_store = get_vector_store(
+        persist_directory,
+        embedding_model,
+        space=settings.CHROMA_HNSW_SPACE,
+        m=settings.CHROMA_HNSW_M,
+        construction_ef=settings.CHROMA_HNSW_CONSTRUCTION_EF,
+        search_ef=settings.CHROMA_HNSW_SEARCH_EF,
     )
-    return vector_store.as_retriever(search_kwargs={"k": k})
+    search_kwargs = {"k": k}
+    if where:
+        search_kwargs["filter"] = where
+    return vector_store.as_retriever(search_kwargs=search_kwargs)
 
 
-def retrieve_docs(query, retriever):
-    """Retrieve documents using the retriever"""
+def retrieve_docs(query, retriever, where=None):
+    """Retrieve documents using the retriever, with an optional per-query metadata filter"""
+    if where:
+        return retriever.invoke(query, filter=where)
     return retriever.invoke(query)
 
 
+def format_doc_texts(docs) -> List[str]:
+    """Render retrieved documents (metadata header + content) for summarizer prompts"""
+    return [
+        f"[Metadata: {', '.join(f'{k}: {v}' for k, v in doc.metadata.items())}]\n{doc.page_content}" for doc in docs]
+
+
 def parse_reasoner_json(text: str) -> dict:
     """
     Robustly extract the first {...} JSON object appearing in `text`.
@@ -106,22 +168,29 @@ class KBAgent(RoutedAgent):
         self.retriever = get_chroma_retriever(
             self.persist_directory,
             self.embedding_model,
-            k=15
+            k=settings.KB_RETRIEVAL_K
         )
         # Try to log the number of documents in the Chroma vector store
         try:
-            vector_store = Chroma(
-                persist_directory=self.persist_directory,
-                embedding_function=self.embedding_model,
-            )
-            doc_count = vector_store._collection.count() if hasattr(
-                vector_store, '_collection') else 'unknown'
+            doc_count = self.retriever.vectorstore._collection.count()
             logger.info(
                 f"[KBAgent] Chroma vector store document count: {doc_count}")
         except Exception as e:
             logger.warning(
                 f"[KBAgent] Could not get Chroma vector store document count: {e}")
 
+        # Reranker scores are cached per index version; the version changes on re-ingestion
+        self.index_version = IndexVersionTracker(
+            self.persist_directory, settings.KB_INDEX_VERSION_CHECK_INTERVAL)
+
+        # Document/section metadata used to pre-filter retrieval, reloaded with the index
+        self.metadata_index = None
+        self._metadata_index_version = None
+
+        # Load the reranker (and start its batching service) up front so the first
+        # query doesn't pay for it
+        get_rerank_service()
+
         # Create LLM client using the generic factory
         self.llm_client, self.model_name = create_llm_client("kb")
         self.light_llm_client, self.light_model_name = create_light_llm_client(
@@ -129,12 +198,167 @@ class KBAgent(RoutedAgent):
         self.llm = self.llm_client.chat.completions
         self.light_llm = self.light_llm_client.chat.completions
 
-    def run_resp_pipeline(self, main_question: str, max_hops: int = 5) -> Dict[str, Any]:
+        # Sub-questions of a hop are processed concurrently: retrieval/rerank run on a
+        # dedicated CPU pool, LLM calls are awaited, both bounded by the semaphore.
+        self._cpu_executor = ThreadPoolExecutor(
+            max_workers=settings.KB_CPU_WORKERS, thread_name_prefix="kb-cpu")
+        self._subq_semaphore = asyncio.Semaphore(
+            settings.KB_SUBQUESTION_CONCURRENCY)
+
+    async def _complete(self, llm, model: str, prompt: str) -> str:
+        """Run a single chat completion off the event loop and return its content"""
+        response = await asyncio.to_thread(
+            llm.create,
+            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            temperature=0.1
+        )
+        return response.choices[0].message.content
+
+    def _route_query(self, query_text: str):
+        """Metadata `where` filter for the documents/sections named in the query, if any"""
+        version = self.index_version.current()
+        if version != self._metadata_index_version:
+            self.metadata_index = MetadataIndex.load(
+                self.persist_directory, self.retriever.vectorstore._collection)
+            self._metadata_index_version = version
+        if not self.metadata_index:
+            return None
+        return self.metadata_index.route(query_text)
+
+    def _retrieve_and_rerank(self, query_text: str, pool: DocumentPool = None) -> Tuple[List[Any], Any, List[float]]:
+        """
+        Retrieve, rerank and metadata-boost documents for a query (CPU bound).
+        With a request `pool`, chunks an earlier sub-question already summarized skip the
+        reranker and compete with their down-weighted earlier score.
+        Returns (docs, metadata filter used, reranker scores aligned with docs).
+        """
+        where = self._route_query(query_text)
+        docs = retrieve_docs(query_text, self.retriever, where)
+        if where and len(docs) < settings.KB_PREFILTER_MIN_RESULTS:
+            logger.info(
+                f"[KBAgent] Metadata filter {where} returned {len(docs)} chunks, retrying without it")
+            where = None
+            docs = retrieve_docs(query_text, self.retriever)
+        elif where:
+            logger.info(f"[KBAgent] Routed query to metadata filter {where}")
+        summarized = []
+        if pool is not None:
+            docs, summarized = pool.partition(docs)
+        docs, scores = rerank(query_text, docs, index_version=self.index_version.current(), return_scores=True)
+        if pool is not None:
+            pool.record_scores(docs, scores)
+        if summarized:
+            ranked = sorted(list(zip(docs, scores)) + summarized, key=lambda pair: pair[1], reverse=True)
+            docs, scores = [doc for doc, _ in ranked], [score for _, score in ranked]
+        score_by_id = {chunk_id(doc): score for doc, score in zip(docs, scores)}
+        # The metadata boost sees every candidate, as before the reranker cut was added
+        docs = boost_by_metadata(query_text, docs)[:5]
+        return docs, where, [score_by_id[chunk_id(doc)] for doc in docs]
+
+    async def _summarize(self, main_question: str, query_text: str, doc_texts: List[str]) -> Tuple[str, str, Any]:
+        """
+        Produce (global_summary, local_summary, answerable) for a sub-question.
+        With KB_FUSED_SUMMARIZATION both come from one structured call that also reports
+        whether the passages fully answer the question; if that output cannot be parsed
+        we fall back to the two-prompt path, run concurrently, and `answerable` is None.
+        """
+        docs = "\n".join(doc_texts)
+
+        if settings.KB_FUSED_SUMMARIZATION:
+            fused_prompt = FUSED_SUMMARIZER_PROMPT.format(
+                main_question=main_question,
+                sub_question=query_text,
+                docs=docs
+            )
+            fused_raw = await self._complete(
+                self.light_llm, self.light_model_name, fused_prompt)
+            fused = safe_json_parse(escape_unescaped_newlines_in_json_strings(
+                strip_markdown_code_fence(fused_raw or "")))
+            global_summary = fused.get("global_summary")
+            local_summary = fused.get("local_summary")
+            if isinstance(global_summary, str) and isinstance(local_summary, str) \
+                    and global_summary.strip() and local_summary.strip():
+                answerable = fused.get("answerable")
+                return global_summary, local_summary, answerable if isinstance(answerable, bool) else None
+            logger.warning(
+                "[KBAgent] Could not parse fused summarizer output, falling back to separate summaries")
+
+        global_summary_prompt = GLOBAL_SUMMARIZER_PROMPT.format(
+            main_question=main_question,
+            docs=docs
+        )
+        local_summary_prompt = LOCAL_SUMMARIZER_PROMPT.format(
+            sub_question=query_text,
+            docs=docs
+        )
+        global_summary, local_summary = await asyncio.gather(
+            self._complete(self.light_llm, self.light_model_name, global_summary_prompt),
+            self._complete(self.light_llm, self.light_model_name, local_summary_prompt),
+        )
+        return global_summary, local_summary, None
+
+    async def _process_sub_question(self, main_question: str, query_text: str, hop: int,
+                                    documents: Dict[str, Dict[str, Any]], pool: DocumentPool) -> Dict[str, Any]:
+        """
+        Retrieve evidence for one sub-question and produce its global and local summaries.
+        Retrieved chunks are registered once in the request's `documents` table and the
+        returned trace entry references them by id; summarized chunks are marked in `pool`.
+        """
+        async with self._subq_semaphore:
+            loop = asyncio.get_running_loop()
+            docs, where, scores = await loop.run_in_executor(
+                self._cpu_executor, self._retrieve_and_rerank, query_text, pool)
+            doc_texts = format_doc_texts(docs)
+            global_summary, local_summary, answerable = await self._summarize(
+                main_question, query_text, doc_texts)
+            pool.mark_summarized(docs)
+            logger.info(f"[Hop {hop}] Global summary: {global_summary}")
+            logger.info(
+                f"[Hop {hop}] Local summary for '{query_text}': {local_summary}")
+
+        return {
+            "sub_question": query_text,
+            "retrieved_doc_ids": add_documents(documents, docs),
+            "global_summary": global_summary,
+            "local_summary": local_summary,
+            "metadata_filter": where,
+            "rerank_scores": [round(score, 4) for score in scores],
+            "answerable": answerable
+        }
+
+    async def _merge_similar_sub_questions(self, subq_memory: SubQuestionMemory, candidates: List[str],
+                                           hop_info: Dict[str, Any]) -> List[str]:
+        """
+        Drop candidates that rephrase an earlier sub-question; the earlier local summary
+        stands in for them. Merges are recorded on `hop_info` (the hop that proposed them).
+        """
+        try:
+            kept, merges = await subq_memory.filter_new(candidates)
+        except Exception as e:
+            logger.warning(f"[ReSPPipeline] Sub-question de-duplication failed, keeping all: {e}")
+            return candidates
+        for merge in merges:
+            logger.info(
+                f"[Hop {hop_info['hop']}] Merged sub-question '{merge['sub_question']}' into "
+                f"'{merge['merged_into']}' (similarity {merge['similarity']})")
+        if merges:
+            hop_info.setdefault("merged_sub_questions", []).extend(merges)
+        return kept
+
+    async def run_resp_pipeline(self, main_question: str, max_hops: int = 5) -> Dict[str, Any]:
         """Run the ReSP (Retrieval-enhanced Summarization Pipeline) for multi-hop reasoning"""
         global_memory = []
         local_memory = []
         all_sub_questions = []  # Flat list of all sub-questions ever asked
         hops_trace = []
+        documents = {}  # chunk id -> {"content", "metadata"}, referenced from the trace
+        pool = DocumentPool(settings.KB_POOL_SUMMARIZED_PENALTY)
+        # Answered sub-questions, used to merge rephrasings the reasoner proposes again
+        subq_memory = SubQuestionMemory(
+            lambda texts: embed(self.embedding_model.model_name, texts, normalize=True),
+            threshold=settings.KB_SUBQUESTION_DEDUP_THRESHOLD,
+        )
         hop = 0
 
         # --- First hop: always answer the main question ---
@@ -142,51 +366,37 @@ class KBAgent(RoutedAgent):
         hop_info = {"hop": hop, "sub_questions": []}
 
         # Retrieve and summarize for main question
-        docs = retrieve_docs(main_question, self.retriever)
-        docs = rerank(main_question, docs)
-        docs = boost_by_metadata(main_question, docs)
-        docs = docs[:5]
+        subq_result = await self._process_sub_question(main_question, main_question, hop, documents, pool)
+        local_summary = subq_result["local_summary"]
 
-        doc_texts = [
-            f"[Metadata: {', '.join(f'{k}: {v}' for k, v in doc.metadata.items())}]\n{doc.page_content}" for doc in docs]
-
-        global_summary_prompt = GLOBAL_SUMMARIZER_PROMPT.format(
-            main_question=main_question,
-            docs="\n".join(doc_texts)
-        )
-        global_summary_response = self.light_llm.create(
-            messages=[{"role": "user", "content": global_summary_prompt}],
-            model=self.light_model_name,
-            temperature=0.1
-        )
-        global_summary = global_summary_response.choices[0].message.content
-        logger.info(f"[Hop 1] Global summary: {global_summary}")
-
-        local_summary_prompt = LOCAL_SUMMARIZER_PROMPT.format(
-            sub_question=main_question,
-            docs="\n".join(doc_texts)
-        )
-        local_summary_response = self.light_llm.create(
-            messages=[{"role": "user", "content": local_summary_prompt}],
-            model=self.light_model_name,
-            temperature=0.1
-        )
-        local_summary = local_summary_response.choices[0].message.content
-        logger.info(
-            f"[Hop 1] Local summary for '{main_question}': {local_summary}")
-
-        global_memory.append(global_summary)
+        global_memory.append(subq_result["global_summary"])
         local_memory.append(
             {"sub_question": main_question, "response": local_summary})
+        subq_memory.add_answered(main_question, local_summary)
 
-        hop_info["sub_questions"].append({
-            "sub_question": main_question,
-            "retrieved_docs": [
-                {"content": doc.page_content, "metadata": dict(doc.metadata)} for doc in docs
-            ],
-            "global_summary": global_summary,
-            "local_summary": local_summary
-        })
+        hop_info["sub_questions"].append(subq_result)
+
+        # --- Fast path: conclusive hop-1 evidence answers without the planner-reasoner ---
+        if settings.KB_SINGLE_HOP_FAST_PATH:
+            confidence = single_hop_confidence(
+                subq_result["rerank_scores"],
+                subq_result["answerable"],
+                settings.KB_SINGLE_HOP_CONFIDENCE_THRESHOLD,
+            )
+            hop_info["fast_path"] = confidence
+            if confidence["conclusive"]:
+                logger.info(
+                    f"[ReSPPipeline] Hop-1 evidence is conclusive (confidence {confidence['confidence']}). "
+                    "Skipping planner-reasoner and using local summary as final answer.")
+                hops_trace.append(hop_info)
+                hops_trace.append({
+                    "hop": "final_simple",
+                    "answer": local_summary,
+                    "method": "single_hop_fast_path",
+                    "confidence": confidence["confidence"]
+                })
+                return {"answer": local_summary, "trace": hops_trace,
+                        "documents": documents, "num_hops": 1}
 
         # --- Now call planner to get next_sub_questions ---
         planner_reasoner_prompt = PLANNER_REASONER_PROMPT.format(
@@ -199,12 +409,8 @@ class KBAgent(RoutedAgent):
         )
 
         logger.debug(f"[Planner Prompt Debug] {planner_reasoner_prompt}")
-        reasoner_response = self.llm.create(
-            messages=[{"role": "user", "content": planner_reasoner_prompt}],
-            model=self.model_name,
-            temperature=0.1
-        )
-        reasoner_raw = reasoner_response.choices[0].message.content
+        reasoner_raw = await self._complete(
+            self.llm, self.model_name, planner_reasoner_prompt)
         logger.info(f"[Hop 1] Reasoner raw: {reasoner_raw}")
         reasoner = parse_reasoner_json(reasoner_raw)
         hop_info["reasoner_output"] = reasoner
@@ -227,7 +433,8 @@ class KBAgent(RoutedAgent):
                 "method": "single_hop_local_summary"
             })
 
-            return {"answer": final_answer, "trace": hops_trace, "num_hops": 1}
+            return {"answer": final_answer, "trace": hops_trace,
+                    "documents": documents, "num_hops": 1}
 
         # --- Use 'next_sub_questions' as the key for sub-questions ---
         current_sub_questions = reasoner.get("next_sub_questions", [])
@@ -248,74 +455,51 @@ class KBAgent(RoutedAgent):
                     "method": "fallback_local_summary"
                 })
 
-                return {"answer": fallback_answer, "trace": hops_trace, "num_hops": 1}
+                return {"answer": fallback_answer, "trace": hops_trace,
+                        "documents": documents, "num_hops": 1}
 
         # Ensure all_sub_questions only contains strings
-        for sq in current_sub_questions:
-            if isinstance(sq, dict):
-                all_sub_questions.append(sq.get("sub_question", ""))
-            else:
-                all_sub_questions.append(sq)
+        current_sub_questions = [
+            sq.get("sub_question", "") if isinstance(sq, dict) else sq
+            for sq in current_sub_questions
+        ]
+        all_sub_questions.extend(current_sub_questions)
+
+        # Drop rephrasings of the main question, already answered by hop 1
+        current_sub_questions = await self._merge_similar_sub_questions(
+            subq_memory, current_sub_questions, hop_info)
+        if not current_sub_questions:
+            logger.info(
+                "[Hop 1] All planned sub-questions duplicate the main question. Using local summary.")
+            hops_trace.append({
+                "hop": "final_fallback",
+                "answer": local_summary,
+                "method": "fallback_local_summary"
+            })
+            return {"answer": local_summary, "trace": hops_trace,
+                    "documents": documents, "num_hops": 1}
 
         while hop < max_hops and not sufficient:
             hop += 1
             hop_info = {"hop": hop, "sub_questions": []}
-            subq_results = []
-
-            for subq in current_sub_questions:
-                # Ensure subq is a string (handle dicts with 'sub_question' key)
-                if isinstance(subq, dict):
-                    query_text = subq.get("sub_question", "")
-                else:
-                    query_text = subq
-
-                docs = retrieve_docs(query_text, self.retriever)
-                docs = rerank(query_text, docs)
-                docs = boost_by_metadata(query_text, docs)
-                docs = docs[:5]
-
-                doc_texts = [
-                    f"[Metadata: {', '.join(f'{k}: {v}' for k, v in doc.metadata.items())}]\n{doc.page_content}" for doc in docs]
-
-                global_summary_prompt = GLOBAL_SUMMARIZER_PROMPT.format(
-                    main_question=main_question,
-                    docs="\n".join(doc_texts)
-                )
-                global_summary_response = self.light_llm.create(
-                    messages=[
-                        {"role": "user", "content": global_summary_prompt}],
-                    model=self.light_model_name,
-                    temperature=0.1
-                )
-                global_summary = global_summary_response.choices[0].message.content
-                logger.info(f"[Hop {hop}] Global summary: {global_summary}")
 
-                local_summary_prompt = LOCAL_SUMMARIZER_PROMPT.format(
-                    sub_question=query_text,
-                    docs="\n".join(doc_texts)
-                )
-                local_summary_response = self.light_llm.create(
-                    messages=[
-                        {"role": "user", "content": local_summary_prompt}],
-                    model=self.light_model_name,
-                    temperature=0.1
-                )
-                local_summary = local_summary_response.choices[0].message.content
-                logger.info(
-                    f"[Hop {hop}] Local summary for '{query_text}': {local_summary}")
-
-                global_memory.append(global_summary)
+            # Ensure each subq is a string (handle dicts with 'sub_question' key)
+            query_texts = [
+                subq.get("sub_question", "") if isinstance(subq, dict) else subq
+                for subq in current_sub_questions
+            ]
+            # gather() preserves input order, so memory is merged deterministically
+            subq_results = await asyncio.gather(*(
+                self._process_sub_question(main_question, query_text, hop, documents, pool)
+                for query_text in query_texts
+            ))
+
+            for subq_result in subq_results:
+                global_memory.append(subq_result["global_summary"])
                 local_memory.append(
-                    {"sub_question": query_text, "response": local_summary})
-
-                subq_results.append({
-                    "sub_question": query_text,
-                    "retrieved_docs": [
-                        {"content": doc.page_content, "metadata": dict(doc.metadata)} for doc in docs
-                    ],
-                    "global_summary": global_summary,
-                    "local_summary": local_summary
-                })
+                    {"sub_question": subq_result["sub_question"], "response": subq_result["local_summary"]})
+                subq_memory.add_answered(
+                    subq_result["sub_question"], subq_result["local_summary"])
 
             # When joining previous_sub_questions, ensure only strings
             previous_sub_questions_str = "\n".join(
@@ -333,16 +517,12 @@ class KBAgent(RoutedAgent):
             )
 
             logger.debug(f"[Planner Prompt Debug] {planner_reasoner_prompt}")
-            reasoner_response = self.llm.create(
-                messages=[{"role": "user", "content": planner_reasoner_prompt}],
-                model=self.model_name,
-                temperature=0.1
-            )
-            reasoner_raw = reasoner_response.choices[0].message.content
+            reasoner_raw = await self._complete(
+                self.llm, self.model_name, planner_reasoner_prompt)
             logger.info(f"[Hop {hop}] Reasoner raw: {reasoner_raw}")
             reasoner = parse_reasoner_json(reasoner_raw)
 
-            hop_info["sub_questions"] = subq_results
+            hop_info["sub_questions"] = list(subq_results)
             hop_info["reasoner_output"] = reasoner
             hops_trace.append(hop_info)
 
@@ -361,14 +541,15 @@ class KBAgent(RoutedAgent):
                 q, dict) else q for q in next_subqs if q]
             next_subqs = [
                 q for q in next_subqs if q and q not in all_sub_questions]
+            all_sub_questions.extend(next_subqs)
+            next_subqs = await self._merge_similar_sub_questions(
+                subq_memory, next_subqs, hop_info)
 
             if not next_subqs:
                 logger.warning(
                     f"[Hop {hop}] No new sub-questions found. Stopping.")
                 break
 
-            for q in next_subqs:
-                all_sub_questions.append(q)
             current_sub_questions = next_subqs
 
         # --- Final answer ---
@@ -383,25 +564,22 @@ class KBAgent(RoutedAgent):
             combined_memory=combined_memory,
             main_question=main_question
         )
-        answer_response = self.llm.create(
-            messages=[{"role": "user", "content": generator_prompt}],
-            model=self.model_name,
-            temperature=0.1
-        )
-        answer = answer_response.choices[0].message.content
+        answer = await self._complete(
+            self.llm, self.model_name, generator_prompt)
 
         hops_trace.append({
             "hop": "final",
             "generator": answer,
             "global_memory": list(global_memory),
-            "local_memory": list(local_memory)
+            "local_memory": list(local_memory),
+            "document_pool": pool.stats()
         })
 
         num_real_hops = sum(
             1 for h in hops_trace if isinstance(h.get("hop"), int))
-        return {"answer": answer, "trace": hops_trace, "num_hops": num_real_hops}
+        return {"answer": answer, "trace": hops_trace, "documents": documents, "num_hops": num_real_hops}
 
-    def query_knowledgebase(self, query: str, max_hops: int = 5) -> Dict[str, Any]:
+    async def query_knowledgebase(self, query: str, max_hops: int = 5) -> Dict[str, Any]:
         """Query the knowledge base using ReSP pipeline with intelligent single/multi-hop detection"""
         try:
             logger.info(f"[KBAgent] Received query: {query}")
@@ -409,71 +587,44 @@ class KBAgent(RoutedAgent):
             # Always use ReSP pipeline - let the planner decide if multi-hop is needed
             logger.info(
                 "[KBAgent] Using ReSP pipeline with intelligent hop detection")
-            result = self.run_resp_pipeline(query, max_hops=max_hops)
+            result = await self.run_resp_pipeline(query, max_hops=max_hops)
 
             # Log the full trace for debugging
             logger.debug(
                 f"[KBAgent] Full trace: {json.dumps(result.get('trace', []), indent=2)}")
 
-            # Extract sources and metadata from the trace
-            sources = []
-            metadata_list = []
-
-            for hop_info in result.get("trace", []):
-                # Handle the new structure where documents are nested under "sub_questions"
-                if "sub_questions" in hop_info:
-                    for subq_info in hop_info["sub_questions"]:
-                        if "retrieved_docs" in subq_info:
-                            for doc in subq_info["retrieved_docs"]:
-                                sources.append(doc["content"])
-
-                                # Extract metadata
-                                meta = doc["metadata"]
-                                pdf_name = (
-                                    os.path.basename(meta.get("source", ""))
-                                    if "source" in meta
-                                    else "Unknown Document"
-                                )
-                                page_number = meta.get("page", 0)
-                                entry = {
-                                    "title": pdf_name,
-                                    "source": meta.get("source", ""),
-                                    "page": page_number,
-                                }
-                                if meta.get("title"):
-                                    entry["document_title"] = meta["title"]
-                                metadata_list.append(entry)
-                # Also handle old structure for backward compatibility
-                elif "retrieved_docs" in hop_info:
-                    for doc in hop_info["retrieved_docs"]:
-                        sources.append(doc["content"])
-
-                        # Extract metadata
-                        meta = doc["metadata"]
-                        pdf_name = (
-                            os.path.basename(meta.get("source", ""))
-                            if "source" in meta
-                            else "Unknown Document"
-                        )
-                        page_number = meta.get("page", 0)
-                        entry = {
-                            "title": pdf_name,
-                            "source": meta.get("source", ""),
-                            "page": page_number,
-                        }
-                        if meta.get("title"):
-                            entry["document_title"] = meta["title"]
-                        metadata_list.append(entry)
-
-            # Remove duplicates from sources and metadata
-            unique_sources = list(dict.fromkeys(sources))
+            # Extract sources and metadata from the doc table, in trace order
+            documents = result.get("documents", {})
+            unique_sources = []
             unique_metadata = []
             seen_entries = set()
-            for entry in metadata_list:
-                entry_key = (entry["source"], entry["page"])
-                if entry_key not in seen_entries:
-                    unique_metadata.append(entry)
-                    seen_entries.add(entry_key)
+            for cid in dict.fromkeys(iter_doc_ids(result.get("trace", []))):
+                doc = documents.get(cid)
+                if doc is None:
+                    continue
+                if doc["content"] not in unique_sources:
+                    unique_sources.append(doc["content"])
+
+                # Extract metadata, one entry per (source, page)
+                meta = doc["metadata"]
+                pdf_name = (
+                    os.path.basename(meta.get("source", ""))
+                    if "source" in meta
+                    else "Unknown Document"
+                )
+                page_number = meta.get("page", 0)
+                entry_key = (meta.get("source", ""), page_number)
+                if entry_key in seen_entries:
+                    continue
+                seen_entries.add(entry_key)
+                entry = {
+                    "title": pdf_name,
+                    "source": meta.get("source", ""),
+                    "page": page_number,
+                }
+                if meta.get("title"):
+                    entry["document_title"] = meta["title"]
+                unique_metadata.append(entry)
 
             # Extract global_summary and local_summary from the first hop if available
             global_summary = ""
@@ -494,6 +645,7 @@ class KBAgent(RoutedAgent):
                 "error": None,
                 "num_hops": result.get("num_hops", 0),
                 "trace": trace,
+                "documents": documents,
                 "global_summary": global_summary,
                 "local_summary": local_summary
             }
@@ -531,10 +683,7 @@ class KBAgent(RoutedAgent):
             max_hops = 5
 
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, self.query_knowledgebase, query, max_hops
-            )
+            result = await self.query_knowledgebase(query, max_hops)
 
             # Validate the result
             validated = KBResponse(**result)
@@ -0,0 +1,215 @@
+"""
+Persistent store of web page chunks shared across web searches.
+
+Chunks are keyed by page URL and the sha256 of the page text: when a scraped page has the
+same content as the stored copy, its chunks (and embeddings, once computed) are reused
+instead of being split and embedded again. Every query retrieves from the newly scraped
+pages plus the stored chunks of its other search results (pages cut by the fetch deadline
+or that failed to load); pages from unrelated earlier searches are not retrieved. Pages
+older than the TTL are dropped, and the store is capped at `max_chunks` by evicting the
+oldest pages first.
+
+Chunks are stored as soon as they are split, so BM25-only searches reuse them too; their
+embeddings are filled in by the first search that uses vector retrieval over them.
+Chunks live in a sqlite file with float32 embeddings (an empty blob until embedded) and
+are mirrored in memory. Their MinHash signatures are stored alongside when the chunks are
+written, so near-duplicate filtering of reused chunks doesn't recompute them on every query.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from llama_index.core.schema import TextNode
+
+from ...utils.logging import get_logger, setup_logger
+from ...utils.settings import settings
+from ..webrag_utils.dedup import signature_from_bytes, signature_to_bytes
+
+setup_logger()
+logger = get_logger("WebChunkStore")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    node_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    embed_model TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    minhash BLOB,
+    created_at REAL NOT NULL
+)
+"""
+
+
+def page_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_node_id(url: str, content_hash: str, position: int) -> str:
+    url_hash = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return f"web-{url_hash}-{content_hash[:12]}-{position}"
+
+
+def make_node(node_id: str, url: str, text: str, embedding: Optional[List[float]] = None) -> TextNode:
+    return TextNode(
+        id_=node_id,
+        text=text,
+        embedding=embedding,
+        metadata={"url": url},
+        excluded_embed_metadata_keys=["url"],
+        excluded_llm_metadata_keys=["url"],
+    )
+
+
+class WebChunkStore:
+    def __init__(self, directory: str, ttl: float = 604800, max_chunks: int = 5000):
+        self.ttl = ttl
+        self.max_chunks = max_chunks
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "chunks.sqlite3"), check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        if "minhash" not in columns:
+            # Stores written before signatures were kept; missing ones are computed on use
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN minhash BLOB")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_url ON chunks (url)")
+        self._conn.commit()
+        # url -> {"content_hash", "embed_model", "created_at", "nodes": [TextNode]}
+        self._pages: Dict[str, Dict] = {}
+        # node_id -> MinHash signature of the chunk text
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._load()
+        self.reused = 0
+        self.stored = 0
+
+    def _load(self) -> None:
+        rows = self._conn.execute(
+            "SELECT node_id, url, content_hash, embed_model, text, embedding, minhash, created_at "
+            "FROM chunks ORDER BY url, position"
+        ).fetchall()
+        for node_id, url, content_hash, embed_model, text, blob, signature, created_at in rows:
+            embedding = None
+            if blob:
+                embedding = array("f")
+                embedding.frombytes(blob)
+                embedding = embedding.tolist()
+            page = self._pages.setdefault(url, {
+                "content_hash": content_hash, "embed_model": embed_model,
+                "created_at": created_at, "nodes": [],
+            })
+            page["nodes"].append(make_node(node_id, url, text, embedding))
+            if signature:
+                self._signatures[node_id] = signature_from_bytes(signature)
+        with self._lock:
+            self._prune()
+        logger.info(f"[WebChunkStore] Loaded {self._chunk_count()} chunks from {len(self._pages)} pages")
+
+    def _chunk_count(self) -> int:
+        return sum(len(page["nodes"]) for page in self._pages.values())
+
+    def _delete_pages(self, urls: Iterable[str]) -> None:
+        # Must be called with the lock held
+        for url in urls:
+            page = self._pages.pop(url, None)
+            for node in page["nodes"] if page else ():
+                self._signatures.pop(node.node_id, None)
+            self._conn.execute("DELETE FROM chunks WHERE url = ?", (url,))
+
+    def _prune(self) -> None:
+        # Must be called with the lock held
+        now = time.time()
+        expired = [url for url, page in self._pages.items() if now - page["created_at"] > self.ttl]
+        self._delete_pages(expired)
+        count = self._chunk_count()
+        evicted = 0
+        for url in sorted(self._pages, key=lambda u: self._pages[u]["created_at"]):
+            if count <= self.max_chunks:
+                break
+            count -= len(self._pages[url]["nodes"])
+            self._delete_pages([url])
+            evicted += 1
+        self._conn.commit()
+        if expired or evicted:
+            logger.info(f"[WebChunkStore] Dropped {len(expired)} expired and {evicted} evicted pages")
+
+    def get(self, url: str, content_hash: str, embed_model: str) -> Optional[List[TextNode]]:
+        """Stored chunks of `url` if the page text and embedding model are unchanged and fresh."""
+        with self._lock:
+            page = self._pages.get(url)
+            if (page is None or page["content_hash"] != content_hash or page["embed_model"] != embed_model
+                    or time.time() - page["created_at"] > self.ttl):
+                return None
+            self.reused += 1
+            return list(page["nodes"])
+
+    def put(self, url: str, content_hash: str, embed_model: str, nodes: List[TextNode],
+            signatures: Optional[Sequence[Optional[Tuple[int, ...]]]] = None) -> None:
+        """
+        Replace the chunks of `url` with `nodes`, embedded or not (node.embedding None), and
+        their MinHash `signatures` (aligned with `nodes`, None where unknown).
+        """
+        signatures = list(signatures) if signatures is not None else [None] * len(nodes)
+        now = time.time()
+        with self._lock:
+            self._delete_pages([url])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks "
+                "(node_id, url, content_hash, embed_model, position, text, embedding, minhash, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (node.node_id, url, content_hash, embed_model, position, node.get_content(),
+                     array("f", node.embedding).tobytes() if node.embedding is not None else b"",
+                     signature_to_bytes(signature) if signature else None, now)
+                    for position, (node, signature) in enumerate(zip(nodes, signatures))
+                ],
+            )
+            for node, signature in zip(nodes, signatures):
+                if signature:
+                    self._signatures[node.node_id] = signature
+            self._pages[url] = {
+                "content_hash": content_hash, "embed_model": embed_model,
+                "created_at": now, "nodes": list(nodes),
+            }
+            self.stored += 1
+            self._prune()
+
+    def pages(self, embed_model: str, urls: Iterable[str]) -> List[Tuple[str, str, List[TextNode]]]:
+        """(url, content_hash, chunks) of the fresh stored pages among `urls` for `embed_model`."""
+        now = time.time()
+        with self._lock:
+            return [
+                (url, page["content_hash"], list(page["nodes"]))
+                for url, page in ((url, self._pages.get(url)) for url in urls)
+                if page is not None and page["embed_model"] == embed_model
+                and now - page["created_at"] <= self.ttl
+            ]
+
+    def signature(self, node_id: str) -> Optional[Tuple[int, ...]]:
+        """Stored MinHash signature of a chunk, if it was saved with one."""
+        with self._lock:
+            return self._signatures.get(node_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pages": len(self._pages), "chunks": self._chunk_count(),
+                    "reused": self.reused, "stored": self.stored}
+
+
+@lru_cache(maxsize=1)
+def get_chunk_store() -> Optional[WebChunkStore]:
+    if not settings.WEBRAG_CHUNK_STORE_ENABLED:
+        return None
+    return WebChunkStore(
+        settings.WEBRAG_CHUNK_STORE_DIR,
+        ttl=settings.WEBRAG_CHUNK_STORE_TTL,
+        max_chunks=settings.WEBRAG_CHUNK_STORE_MAX_CHUNKS,
+    )
@@ -1,35 +1,44 @@
-from groq import Groq
+from groq import AsyncGroq, Groq
 from llama_index.core import (Settings, StorageContext,
                               VectorStoreIndex)
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core.retrievers import QueryFusionRetriever
+from llama_index.core.schema import MetadataMode
 from llama_index.core.vector_stores import SimpleVectorStore
 from llama_index.retrievers.bm25 import BM25Retriever
 
 from ...utils.logging import get_logger, setup_logger
 from ..webrag_integrations.groq import GroqIntegration
 from ..webrag_utils.config import GROQ_API_KEY
-from ..webrag_utils.retry import retry_with_reduction_and_backoff
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from ..webrag_utils.dedup import NearDuplicateFilter, minhash
+from ..webrag_utils.retry import (aretry_with_backoff, context_limit,
+                                  error_check_fn_request_too_large, fit_context,
+                                  retry_with_reduction_and_backoff)
+from ...utils.embedding_registry import RegistryLlamaIndexEmbedding
 from ...utils.settings import settings
+from .chunk_store import chunk_node_id, get_chunk_store, make_node, page_hash
 
 setup_logger()
 logger = get_logger("WebRAG")
 
+WEB_EMBED_MODEL = "all-MiniLM-L6-v2"
+
 groq_integration = GroqIntegration(api_key=GROQ_API_KEY)
 
 
 class RAG:
-    def __init__(self, model=None, max_retries=15, reduction_percent=0.2):
+    def __init__(self, model=None, max_retries=15, reduction_percent=0.2, use_chunk_store=True):
         self.storage_context = StorageContext.from_defaults(
             vector_store=SimpleVectorStore()
         )
         self.client = Groq(api_key=GROQ_API_KEY)
+        self.async_client = AsyncGroq(api_key=GROQ_API_KEY)
         self.model = model or settings.WEBRAG_LLM_DEFAULT_MODEL
         self.temperature = 0.5
         self.max_retries = max_retries
         self.reduction_percent = reduction_percent
         self.retriever = None
+        self.chunk_store = get_chunk_store() if use_chunk_store else None
 
     def set_llm(self, llm: str = "groq"):
         """
@@ -47,14 +56,181 @@ class RAG:
         else:
             raise ValueError("Invalid LLM specified for RAG. Only 'groq' is supported.")
 
-    def build_index(self, documents):
+    def start_index(self, retrieval_mode=None, result_urls=None):
+        """
+        Create an empty index; pages are added with add_documents as they arrive.
+
+        :param retrieval_mode: 'hybrid' (BM25 + embeddings), 'bm25' (no embeddings) or
+            'adaptive' (embed only when the corpus exceeds WEBRAG_ADAPTIVE_EMBED_MIN_CHUNKS).
+        :param result_urls: URLs of the current search results. Stored chunks of those not
+            scraped this time (cut by the deadline, failed) are added by finalize_index.
+        """
+        self.retrieval_mode = retrieval_mode or settings.WEBRAG_RETRIEVAL_MODE
+        if self.retrieval_mode not in ("hybrid", "bm25", "adaptive"):
+            raise ValueError(f"Invalid retrieval mode: {self.retrieval_mode}")
+        self.splitter = SentenceSplitter(chunk_size=256)
+        self.embed_model = RegistryLlamaIndexEmbedding(model_name=WEB_EMBED_MODEL)
+        self.index = VectorStoreIndex(
+            nodes=[], storage_context=self.storage_context, embed_model=self.embed_model
+        )
+        self.nodes = []
+        # (url, content_hash, nodes) of pages whose chunks haven't been embedded yet
+        self.pending = []
+        self.indexed_urls = set()
+        self.result_urls = set(result_urls or ())
+        self.retriever = None
+        # Mirrors and syndicated copies are dropped before they are chunked or embedded
+        self.page_filter = self.chunk_filter = None
+        # node_id -> MinHash signature, saved with new chunks in the chunk store
+        self.signatures = {}
+        if settings.WEBRAG_DEDUP_ENABLED:
+            self.page_filter = NearDuplicateFilter(settings.WEBRAG_DEDUP_THRESHOLD)
+            self.chunk_filter = NearDuplicateFilter(settings.WEBRAG_DEDUP_THRESHOLD)
+
+    def _unique_chunks(self, nodes):
+        """
+        `nodes` minus near-duplicates of chunks already kept. Stored chunks use the MinHash
+        signature saved with them; only new chunks have theirs computed.
+        """
+        if self.chunk_filter is None:
+            return nodes
+        unique = []
+        for node in nodes:
+            text = node.get_content()
+            signature = self.chunk_store.signature(node.node_id) if self.chunk_store is not None else None
+            if signature is None:
+                signature = minhash(text)
+            self.signatures[node.node_id] = signature
+            if not self.chunk_filter.is_duplicate(text, signature):
+                unique.append(node)
+        return unique
 
-        splitter = SentenceSplitter(chunk_size=256)
-        embed_model = HuggingFaceEmbedding(model_name="all-MiniLM-L6-v2")
-        self.index = VectorStoreIndex.from_documents(
+    def _store(self, url, content_hash, nodes):
+        if url and self.chunk_store is not None:
+            self.chunk_store.put(url, content_hash, WEB_EMBED_MODEL, nodes,
+                                 [self.signatures.get(node.node_id) for node in nodes])
 
-            documents=documents, transformations=[splitter],embed_model=embed_model  
+    def _embed(self, url, content_hash, nodes):
+        """Embed `nodes` in place and keep them in the chunk store."""
+        embeddings = self.embed_model.get_text_embedding_batch(
+            [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
         )
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding
+        self._store(url, content_hash, nodes)
+
+    def _needs_embedding(self, url, content_hash, nodes):
+        """Embed stored chunks saved without embeddings now (hybrid) or in finalize_index."""
+        if all(node.embedding is not None for node in nodes):
+            return
+        if self.retrieval_mode == "hybrid":
+            self._embed(url, content_hash, nodes)
+        else:
+            self.pending.append((url, content_hash, nodes))
+
+    def _page_chunks(self, document):
+        """
+        Chunks of `document`, reused (with their embeddings, if computed) from the chunk
+        store when the page text is unchanged. New chunks are stored and embedded right away
+        in hybrid mode; otherwise they are stored without embeddings and embedding is
+        deferred to finalize_index.
+        """
+        url = document.metadata.get("url")
+        content_hash = page_hash(document.text)
+        if url:
+            self.indexed_urls.add(url)
+        if url and self.chunk_store is not None:
+            nodes = self.chunk_store.get(url, content_hash, WEB_EMBED_MODEL)
+            if nodes is not None:
+                # The whole page is embedded so its stored copy stays complete
+                self._needs_embedding(url, content_hash, nodes)
+                return self._unique_chunks(nodes)
+
+        # Chunks duplicating ones already indexed are not stored either: when this page is
+        # reused later, the chunks it duplicated are in the store with their own pages
+        nodes = self.splitter.get_nodes_from_documents([document])
+        if url:
+            nodes = [
+                make_node(chunk_node_id(url, content_hash, position), url, node.get_content())
+                for position, node in enumerate(nodes)
+            ]
+        nodes = self._unique_chunks(nodes)
+        if not nodes:
+            return []
+        if self.retrieval_mode == "hybrid":
+            self._embed(url, content_hash, nodes)
+        else:
+            self._store(url, content_hash, nodes)
+            self.pending.append((url, content_hash, nodes))
+        return nodes
+
+    def add_documents(self, documents):
+        """Chunk (and in hybrid mode embed and insert) `documents`."""
+        count = 0
+        for document in documents:
+            if self.page_filter is not None and self.page_filter.is_duplicate(document.text):
+                logger.info(f"[WebRAG] Skipping near-duplicate page {document.metadata.get('url')}")
+                continue
+            nodes = self._page_chunks(document)
+            if nodes:
+                self.nodes.extend(nodes)
+                if self.retrieval_mode == "hybrid":
+                    self.index.insert_nodes(nodes)
+                count += len(nodes)
+        return count
+
+    def finalize_index(self):
+        """
+        Add the stored chunks of search results not scraped for this query, then build the
+        retriever over the union: BM25 fused with vector search, or BM25 alone when the mode
+        (or, in adaptive mode, few freshly scraped chunks) makes embedding not worth its cost.
+        Stored pages outside the current results are never added, so answers only cite them.
+
+        Scraped pages are in the chunk store whatever the mode; a BM25-only index leaves them
+        unembedded, and their embeddings are computed the first time a vector index uses them.
+        """
+        scraped = len(self.nodes)
+        stored = []
+        if self.chunk_store is not None and self.result_urls:
+            for url, content_hash, nodes in self.chunk_store.pages(
+                    WEB_EMBED_MODEL, self.result_urls - self.indexed_urls):
+                stored.extend(self._unique_chunks(nodes))
+                if any(node.embedding is None for node in nodes):
+                    self.pending.append((url, content_hash, nodes))
+            self.nodes.extend(stored)
+            logger.info(f"[WebRAG] Added {len(stored)} stored chunks; store {self.chunk_store.stats()}")
+        if self.chunk_filter is not None:
+            logger.info(f"[WebRAG] Near-duplicate pages {self.page_filter.stats()}, chunks {self.chunk_filter.stats()}")
+        if not self.nodes:
+            raise RuntimeError("No documents were indexed. Check the fetched pages.")
+
+        # Stored chunks don't count: the corpus of this search is what was scraped for it,
+        # and a growing store would otherwise switch adaptive mode to embedding for good
+        use_vectors = self.retrieval_mode == "hybrid" or (
+            self.retrieval_mode == "adaptive"
+            and scraped > settings.WEBRAG_ADAPTIVE_EMBED_MIN_CHUNKS
+        )
+        logger.info(
+            f"[WebRAG] {scraped} scraped + {len(stored)} stored chunks, mode {self.retrieval_mode}: "
+            f"{'BM25 + vector' if use_vectors else 'BM25 only'}")
+
+        if not use_vectors:
+            # Pending pages stay in the chunk store unembedded
+            self.pending = []
+            self.retriever = BM25Retriever.from_defaults(nodes=self.nodes, similarity_top_k=5)
+            return
+
+        # Pages embedded here: scraped ones outside hybrid mode, stored ones saved unembedded
+        for url, content_hash, nodes in self.pending:
+            self._embed(url, content_hash, nodes)
+        self.pending = []
+        if self.retrieval_mode == "hybrid":
+            # Scraped chunks were inserted as they arrived
+            if stored:
+                self.index.insert_nodes(stored)
+        else:
+            self.index.insert_nodes(self.nodes)
+
         bm25_retriever = BM25Retriever.from_defaults(
             docstore=self.index.docstore, similarity_top_k=15
         )
@@ -67,7 +243,11 @@ class RAG:
             use_async=True,
             verbose=True,
         )
-        
+
+    def build_index(self, documents, retrieval_mode=None, result_urls=None):
+        self.start_index(retrieval_mode, result_urls)
+        self.add_documents(documents)
+        self.finalize_index()
 
     def query_index(self, query):
 
@@ -102,3 +282,35 @@ class RAG:
             delay_for_rate_limit=5,
         )
         return final_response, final_context
+
+    async def aquery_llm(self, query, context, template):
+        """
+        Async query_llm: the context is trimmed once, up front, to the model's prompt
+        budget, and rate limits are retried with jittered backoff without blocking a thread.
+        """
+        max_prompt_tokens = min(
+            context_limit(self.model) - settings.WEBRAG_COMPLETION_TOKEN_RESERVE,
+            settings.WEBRAG_MAX_PROMPT_TOKENS,
+        )
+
+        # The token estimate is approximate; if the provider still rejects the prompt as
+        # too large, refit to a smaller budget rather than trimming in small steps
+        for _ in range(3):
+            fitted = fit_context(template, query, context, max_prompt_tokens)
+            message_content = template.format(context=fitted, query=query)
+            logger.info(f"[WebSearch] Prompt Formatted :  {message_content}")
+            try:
+                response = await aretry_with_backoff(
+                    lambda: self.async_client.chat.completions.create(
+                        messages=[{"role": "user", "content": message_content}],
+                        model=self.model,
+                        temperature=self.temperature,
+                    ),
+                    max_retries=settings.WEBRAG_LLM_MAX_RETRIES,
+                )
+                return response.choices[0].message.content.strip(), fitted
+            except Exception as e:
+                if not error_check_fn_request_too_large(str(e)):
+                    raise RuntimeError(f"Unrecoverable error: {e}") from e
+                max_prompt_tokens = int(max_prompt_tokens * 0.75)
+        raise RuntimeError("Prompt still too large after reducing the context.")
@@ -1,47 +1,159 @@
-import re
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import aclosing
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
 
-import html2text
-import requests
 from llama_index.core import Document
 
 from ...utils.logging import get_logger, setup_logger
+from ...utils.settings import settings
+from .extraction import clean_text, extract_text, extraction_profile
+from .fetcher import AsyncPageFetcher, FetchResult
+from .page_cache import PageCache
 
 setup_logger()
 logger = get_logger("DataScraper")
 
 
+@lru_cache(maxsize=1)
+def get_extraction_pool() -> Optional[Executor]:
+    """Shared process pool for HTML extraction; None runs it on the default thread pool."""
+    if settings.WEBRAG_EXTRACT_WORKERS <= 0:
+        return None
+    # spawn: forking a process that already runs threads (uvicorn, torch) is unsafe
+    return ProcessPoolExecutor(
+        max_workers=settings.WEBRAG_EXTRACT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
 class DataScraper:
-    def __init__(self):
-        self.converter = html2text.HTML2Text()
-        self.converter.ignore_links = True
-        self.converter.ignore_images = True
-        self.converter.ignore_emphasis = True
+    def __init__(self, fetcher: Optional[AsyncPageFetcher] = None, page_cache: Optional[PageCache] = None):
+        self.extraction_mode = settings.WEBRAG_EXTRACTION_MODE
+        self.max_text_bytes = settings.WEBRAG_EXTRACT_MAX_BYTES
+        self.fetcher = fetcher or AsyncPageFetcher(
+            timeout=settings.WEBRAG_FETCH_TIMEOUT,
+            max_bytes=settings.WEBRAG_FETCH_MAX_BYTES,
+            per_host_limit=settings.WEBRAG_FETCH_PER_HOST_LIMIT,
+            max_connections=settings.WEBRAG_FETCH_MAX_CONNECTIONS,
+        )
+        if page_cache is None and settings.WEBRAG_PAGE_CACHE_ENABLED:
+            page_cache = PageCache(
+                settings.WEBRAG_PAGE_CACHE_DIR,
+                extraction_profile(self.extraction_mode, self.max_text_bytes),
+                ttl=settings.WEBRAG_PAGE_CACHE_TTL,
+                max_bytes=settings.WEBRAG_PAGE_CACHE_MAX_BYTES,
+            )
+        self.page_cache = page_cache
 
     @staticmethod
     def clean_text(text):
-        text = re.sub(r"\n+", "\n", text)
-        text = re.sub(r"\s{2,}", " ", text)
-        return text.strip()
+        return clean_text(text)
 
-    def fetch_data_from_urls(self, urls):
-        documents = []
+    def html_to_text(self, content: bytes) -> str:
+        return extract_text(content, self.extraction_mode, self.max_text_bytes)
 
-        for url in urls:
-            try:
+    @staticmethod
+    def make_document(url: str, text: str) -> Document:
+        return Document(
+            text=text,
+            metadata={"url": url},
+            excluded_embed_metadata_keys=["url"],
+            excluded_llm_metadata_keys=["url"],
+        )
+
+    async def convert(self, result: FetchResult) -> Optional[str]:
+        """Cleaned text of a fetched page, or None if the fetch failed or the page is empty."""
+        if not result.ok:
+            logger.error(f"Error retrieving data from url {result.url}: {result.error or result.status}")
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            text = await loop.run_in_executor(
+                get_extraction_pool(), extract_text, result.content, self.extraction_mode, self.max_text_bytes)
+        except Exception as e:
+            logger.error(f"Error converting data from url {result.url}: {e}")
+            return None
+        if text and self.page_cache is not None:
+            await loop.run_in_executor(
+                None, lambda: self.page_cache.put(
+                    result.url, text,
+                    etag=result.headers.get("etag"),
+                    last_modified=result.headers.get("last-modified"),
+                )
+            )
+        return text or None
+
+    async def to_document(self, result: FetchResult) -> Optional[Document]:
+        text = await self.convert(result)
+        return self.make_document(result.url, text) if text else None
 
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                html_content = response.content.decode("utf-8", errors="ignore")
-                text = self.converter.handle(html_content)
-                clean_text = self.clean_text(text)
-                if clean_text:
-                    documents.append(Document(text=clean_text))
+    async def iter_documents(self, urls, deadline: Optional[float] = None) -> AsyncIterator[Document]:
+        """
+        Fetch `urls` concurrently and yield each page as a Document as soon as it arrives,
+        so indexing can start before the slowest page is downloaded. Pages fresh in the page
+        cache are yielded first without a request; stale ones are revalidated with a
+        conditional GET and served from the cache on 304 (or if the refetch fails).
+        """
+        deadline = settings.WEBRAG_FETCH_DEADLINE if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        urls = list(dict.fromkeys(urls))
 
-            except Exception as e:
-                logger.error(f"Error retrieving data from url:{e}")
+        cached = {}
+        if self.page_cache is not None:
+            cached = await loop.run_in_executor(None, self.page_cache.get_many, urls)
+        to_fetch, conditional = [], {}
+        for url in urls:
+            page = cached.get(url)
+            if page is not None and page.is_fresh(self.page_cache.ttl):
+                logger.info(f"[DataScraper] {url} -> page cache")
+                yield self.make_document(url, page.text)
+                continue
+            to_fetch.append(url)
+            if page is not None:
+                conditional[url] = page.conditional_headers()
+
+        # aclosing: when the consumer stops early, in-flight fetches are cancelled right away
+        async with aclosing(self.fetcher.iter_fetch(
+                to_fetch, deadline=deadline, headers_by_url=conditional)) as results:
+            async for result in results:
+                logger.info(
+                    f"[DataScraper] {result.url} -> {result.status or result.error} "
+                    f"({len(result.content)} bytes{', truncated' if result.truncated else ''}, "
+                    f"{result.elapsed_ms:.0f} ms)")
+                page = cached.get(result.url)
+                if page is not None and (result.status == 304 or not result.ok):
+                    if result.status == 304:
+                        await loop.run_in_executor(None, self.page_cache.touch, result.url)
+                    yield self.make_document(result.url, page.text)
+                    continue
+                document = await self.to_document(result)
+                if document is not None:
+                    yield document
 
+    async def afetch_data_from_urls(self, urls, deadline: Optional[float] = None) -> List[Document]:
+        documents = [document async for document in self.iter_documents(urls, deadline)]
         if not documents:
             logger.error("No documents Fetches")
-            return documents
-
         return documents
+
+    def fetch_data_from_urls(self, urls):
+        """Blocking wrapper for scripts; async callers must use `afetch_data_from_urls`."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("fetch_data_from_urls() called from a running event loop; "
+                               "await afetch_data_from_urls() instead")
+
+        async def fetch():
+            # The client belongs to this short-lived loop, so close it before the loop ends
+            try:
+                return await self.afetch_data_from_urls(urls)
+            finally:
+                await self.fetcher.aclose()
+
+        return asyncio.run(fetch())
@@ -0,0 +1,102 @@
+"""
+Near-duplicate detection for scraped pages and chunks with MinHash signatures.
+
+Texts are compared as sets of word 3-shingles; a 64-value MinHash signature estimates
+the Jaccard similarity of two sets. Signatures are indexed with LSH (16 bands of 4
+values), so a lookup only compares the few texts sharing a band, and a candidate is a
+duplicate when its estimated Jaccard similarity reaches the threshold. MinHash is used
+rather than SimHash because chunks are short: a few edited words in a 256-token chunk
+move a 64-bit SimHash by far more bits than the usual distance thresholds allow.
+"""
+
+import hashlib
+import random
+import re
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big")
+        for s in shingles(text)
+    ]
+    if not hashes:
+        return tuple([_MAX_HASH] * NUM_PERMUTATIONS)
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def signature_to_bytes(signature: Tuple[int, ...]) -> bytes:
+    return array("I", signature).tobytes()
+
+
+def signature_from_bytes(blob: bytes) -> Tuple[int, ...]:
+    signature = array("I")
+    signature.frombytes(blob)
+    return tuple(signature)
+
+
+def estimated_jaccard(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERMUTATIONS
+
+
+class NearDuplicateFilter:
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._signatures: List[Tuple[int, ...]] = []
+        self._bands: List[Dict[Tuple[int, ...], List[int]]] = [defaultdict(list) for _ in range(BANDS)]
+        self.kept = 0
+        self.dropped = 0
+
+    def is_duplicate(self, text: str, signature: Optional[Tuple[int, ...]] = None) -> bool:
+        """
+        True if `text` is a near-duplicate of a text seen before; otherwise remember it.
+        `signature` is the precomputed `minhash(text)`, when the caller already has it.
+        """
+        if not text.strip():
+            return True
+        if signature is None:
+            signature = minhash(text)
+        band_keys = [signature[band * ROWS:(band + 1) * ROWS] for band in range(BANDS)]
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(self._bands[band].get(key, ()))
+        for index in candidates:
+            if estimated_jaccard(signature, self._signatures[index]) >= self.threshold:
+                self.dropped += 1
+                return True
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in enumerate(band_keys):
+            self._bands[band][key].append(index)
+        self.kept += 1
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        return {"kept": self.kept, "dropped": self.dropped}
@@ -0,0 +1,245 @@
+"""
+HTML to text extraction for scraped pages.
+
+Two modes:
+- "full": html2text over the whole page (the original behaviour).
+- "main_content": a readability-style pass that drops boilerplate subtrees (scripts,
+  navigation, headers/footers, sidebars, cookie banners, share widgets, ...), keeps
+  headings and text blocks that aren't mostly links, and restricts the output to the
+  page's <main>/<article> element when it holds enough text.
+
+Both cap the extracted text at `max_bytes`. Extraction is CPU bound, so the scraper runs
+`extract_text` in a process pool; this module only depends on the standard library and
+html2text so worker processes start quickly.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "form",
+    "button", "select", "nav", "header", "footer", "aside", "dialog",
+}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd",
+    "table", "tr", "td", "th", "pre", "blockquote", "figcaption", "h1", "h2", "h3",
+    "h4", "h5", "h6", "br", "hr",
+}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+CODE_TAGS = {"pre", "code"}
+MAIN_TAGS = {"main", "article"}
+# A class/id token is boilerplate when all its words are boilerplate or layout words and
+# at least one is boilerplate: "site-footer", "cookieBanner" and "share-buttons" are,
+# "comment-body" and "shared-snippet" are not
+BOILERPLATE_WORDS = {
+    "cookie", "consent", "gdpr", "banner", "navbar", "nav", "navigation", "menu", "footer",
+    "header", "sidebar", "breadcrumb", "share", "sharing", "social", "comment", "advert",
+    "advertisement", "ad", "promo", "popup", "modal", "subscribe", "newsletter", "related",
+    "recommend", "recommended", "recommendation", "signup", "signin", "login",
+}
+LAYOUT_WORDS = {
+    "site", "page", "main", "global", "top", "bottom", "left", "right", "primary", "secondary",
+    "wrapper", "wrap", "container", "inner", "outer", "area", "bar", "box", "section", "block",
+    "widget", "links", "link", "list", "buttons", "button", "icons", "icon", "item", "items",
+    "posts", "post", "articles", "region", "zone", "slot",
+}
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "alert", "search"}
+
+# Bump when a change to the extractors changes their output, so cached text is refreshed
+EXTRACTION_VERSION = 2
+
+MIN_BLOCK_CHARS = 25
+MAX_LINK_DENSITY = 0.5
+MIN_MAIN_CHARS = 400
+
+
+def _is_boilerplate_token(token: str) -> bool:
+    words = re.findall(r"[a-z]+", re.sub(r"([a-z])([A-Z])", r"\1-\2", token).lower())
+    words = [w[:-1] if w.endswith("s") and w[:-1] in BOILERPLATE_WORDS else w for w in words]
+    return (any(w in BOILERPLATE_WORDS for w in words)
+            and all(w in BOILERPLATE_WORDS or w in LAYOUT_WORDS for w in words))
+
+
+class _Block:
+    __slots__ = ("parts", "link_chars", "heading", "code", "in_main")
+
+    def __init__(self, in_main: bool):
+        self.parts: List[str] = []
+        self.link_chars = 0
+        self.heading = False
+        self.code = False
+        self.in_main = in_main
+
+    def text(self) -> str:
+        return re.sub(r"\s+", " ", "".join(self.parts)).strip()
+
+
+class MainContentParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[_Block] = []
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._main_depth = 0
+        self._heading_depth = 0
+        self._code_depth = 0
+        self._current = _Block(in_main=False)
+
+    def _is_boilerplate(self, tag, attrs) -> bool:
+        if tag == "header" and self._main_depth:
+            # An article's own header holds its title
+            return False
+        if tag in SKIP_TAGS:
+            return True
+        attrs = dict(attrs)
+        # Attributes without a value (<div role>) come through as None
+        if (attrs.get("role") or "").lower() in BOILERPLATE_ROLES:
+            return True
+        if "hidden" in attrs or attrs.get("aria-hidden") == "true":
+            return True
+        if tag in MAIN_TAGS:
+            # <main>/<article> carry the content even when their class mentions e.g. "comment"
+            return False
+        tokens = f"{attrs.get('id') or ''} {attrs.get('class') or ''}".split()
+        return any(_is_boilerplate_token(token) for token in tokens)
+
+    def _flush(self) -> None:
+        if self._current.parts:
+            self.blocks.append(self._current)
+        self._current = _Block(in_main=self._main_depth > 0)
+        self._current.heading = self._heading_depth > 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS:
+                self._flush()
+            return
+        if self._is_boilerplate(tag, attrs):
+            self._skip_tag, self._skip_depth = tag, 1
+            return
+        if tag in MAIN_TAGS:
+            self._main_depth += 1
+        if tag in HEADING_TAGS:
+            self._heading_depth += 1
+        if tag in CODE_TAGS:
+            self._code_depth += 1
+        if tag == "a":
+            self._link_depth += 1
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in MAIN_TAGS and self._main_depth:
+            self._main_depth -= 1
+            self._current.in_main = self._main_depth > 0
+        if tag in HEADING_TAGS and self._heading_depth:
+            self._heading_depth -= 1
+            self._current.heading = self._heading_depth > 0
+        if tag in CODE_TAGS and self._code_depth:
+            self._code_depth -= 1
+        if tag == "a" and self._link_depth:
+            self._link_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_tag is not None or not data:
+            return
+        self._current.parts.append(data)
+        if self._code_depth:
+            self._current.code = True
+        if self._link_depth:
+            self._current.link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _keep(block: _Block, text: str) -> bool:
+    if block.heading:
+        return True
+    # Short code (`pip install foo`) is often the answer itself
+    if len(text) < MIN_BLOCK_CHARS and not block.code:
+        return False
+    return block.link_chars / len(text) <= MAX_LINK_DENSITY
+
+
+def extract_main_content(html_content: str) -> str:
+    parser = MainContentParser()
+    parser.feed(html_content)
+    parser.close()
+
+    kept = []
+    for block in parser.blocks:
+        text = block.text()
+        if text and _keep(block, text):
+            kept.append((block, f"# {text}" if block.heading else text))
+
+    main = [line for block, line in kept if block.in_main]
+    if sum(len(line) for line in main) >= MIN_MAIN_CHARS:
+        return "\n".join(main)
+    return "\n".join(line for _, line in kept)
+
+
+_converter = None
+
+
+def extract_full(html_content: str) -> str:
+    global _converter
+    if _converter is None:
+        import html2text
+
+        _converter = html2text.HTML2Text()
+        _converter.ignore_links = True
+        _converter.ignore_images = True
+        _converter.ignore_emphasis = True
+    return _converter.handle(html_content)
+
+
+def clean_text(text: str) -> str:
+    text = re.sub(r"\n+", "\n", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    return text.strip()
+
+
+def cap_bytes(text: str, max_bytes: Optional[int]) -> str:
+    if not max_bytes:
+        return text
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", errors="ignore")
+
+
+def extraction_profile(mode: str, max_bytes: Optional[int]) -> str:
+    """Identifier of the text `extract_text` produces for these arguments, for caching."""
+    return f"{mode}:{max_bytes or 0}:v{EXTRACTION_VERSION}"
+
+
+def extract_text(content: bytes, mode: str = "main_content", max_bytes: Optional[int] = None) -> str:
+    """Cleaned text of the HTML page `content`, at most `max_bytes` UTF-8 bytes."""
+    html_content = content.decode("utf-8", errors="ignore")
+    if mode == "main_content":
+        text = extract_main_content(html_content)
+    elif mode == "full":
+        text = extract_full(html_content)
+    else:
+        raise ValueError(f"Unknown extraction mode: {mode}")
+    return cap_bytes(clean_text(text), max_bytes)
@@ -0,0 +1,140 @@
+"""
+Concurrent page fetcher for web scraping.
+
+One pooled `httpx.AsyncClient` is shared by all fetches. Each host is limited to a few
+concurrent requests, every response body is capped at `max_bytes`, and `iter_fetch`
+yields pages in completion order until a global deadline, cancelling whatever is still
+in flight when the deadline passes or the consumer stops early.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from ...utils.logging import get_logger, setup_logger
+
+setup_logger()
+logger = get_logger("PageFetcher")
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; GenieMentorBot/1.0)"
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    content: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    truncated: bool = False
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+class AsyncPageFetcher:
+    def __init__(self, timeout: float = 10.0, max_bytes: int = 2_000_000, per_host_limit: int = 2,
+                 max_connections: int = 20, user_agent: str = DEFAULT_USER_AGENT):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.user_agent = user_agent
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # The client and semaphores are bound to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return self._client
+        previous = self._client
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={"User-Agent": self.user_agent},
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        self._loop = loop
+        self._host_limits = {}
+        if previous is not None:
+            # Left over from another event loop: release its pooled connections. The new
+            # client is installed first so concurrent fetches don't replace it again.
+            try:
+                await previous.aclose()
+            except Exception as e:
+                logger.debug(f"[PageFetcher] Could not close the previous client cleanly: {e}")
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """GET `url`, reading at most `max_bytes` of the body. Never raises."""
+        client = await self._get_client()
+        start = time.perf_counter()
+        result = FetchResult(url=url)
+        try:
+            async with self._host_limit(url):
+                async with client.stream("GET", url, headers=headers) as response:
+                    result.status = response.status_code
+                    result.headers = dict(response.headers)
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body.extend(chunk)
+                        if len(body) >= self.max_bytes:
+                            result.truncated = True
+                            break
+                    result.content = bytes(body[:self.max_bytes])
+            if result.status >= 400:
+                result.error = f"HTTP {result.status}"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    async def iter_fetch(self, urls: Iterable[str], deadline: Optional[float] = None,
+                         headers_by_url: Optional[Dict[str, Dict[str, str]]] = None) -> AsyncIterator[FetchResult]:
+        """
+        Fetch all `urls` concurrently and yield results as they complete. `deadline` is
+        in seconds from now; fetches still running then are cancelled.
+        """
+        headers_by_url = headers_by_url or {}
+        tasks = {
+            asyncio.ensure_future(self.fetch(url, headers_by_url.get(url)))
+            for url in dict.fromkeys(urls)
+        }
+        end = time.monotonic() + deadline if deadline else None
+        try:
+            while tasks:
+                timeout = None if end is None else max(0.0, end - time.monotonic())
+                done, tasks = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.warning(
+                        f"[PageFetcher] Deadline of {deadline}s reached, cancelling {len(tasks)} fetches")
+                    break
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
@@ -1,68 +1,151 @@
 import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from ...utils.logging import get_logger, setup_logger
+from ...utils.settings import settings
+
+setup_logger()
+logger = get_logger("GoogleSearch")
+
+SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+PER_REQUEST_RESULTS = 10
+
+
+class SearchResultCache:
+    """Bounded TTL cache of search results keyed by (normalized query, result count)."""
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, count: int) -> Tuple[str, int]:
+        return re.sub(r"\s+", " ", query.strip().lower()), count
+
+    def get(self, query: str, count: int) -> Optional[List[Dict]]:
+        key = self.key(query, count)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(item) for item in entry[1]]
+
+    def put(self, query: str, count: int, results: List[Dict]) -> None:
+        key = self.key(query, count)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), [dict(item) for item in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
 
 
 class GoogleSearch:
-    def __init__(self, api_key, cx):
+    def __init__(self, api_key, cx, cache: Optional[SearchResultCache] = None, max_workers: int = 4):
         self.api_key = api_key
         self.cx = cx
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Result page fetches only; they never wait on other tasks in this pool
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="google-search")
+        # Video searches run alongside the general search and wait on their page fetches
+        # in `executor`, so they get their own pool: sharing one could deadlock under load
+        self.search_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="google-video-search")
+        self.cache = cache or SearchResultCache(
+            ttl=settings.WEBRAG_SEARCH_CACHE_TTL,
+            max_entries=settings.WEBRAG_SEARCH_CACHE_MAX_ENTRIES,
+        )
 
-    def _make_search_call(self, query, max_results):
-        search_url = "https://www.googleapis.com/customsearch/v1"
+    def _fetch_page(self, query, start, num):
+        params = {
+            "q": query,
+            "key": self.api_key,
+            "cx": self.cx,
+            "num": num,
+            "start": start,
+        }
+        response = self.session.get(SEARCH_URL, params=params, timeout=10)
+        response.raise_for_status()
         results = []
-        per_request_results = 10
-        num_pages = math.ceil(max_results / per_request_results)
-
-        for i in range(num_pages):
-            start = i * per_request_results + 1
-            params = {
-                "q": query,
-                "key": self.api_key,
-                "cx": self.cx,
-                "num": min(per_request_results, max_results - len(results)),
-                "start": start,
-            }
+        for item in response.json().get("items", []):
+            image_url = None
+            if "pagemap" in item and "cse_image" in item["pagemap"]:
+                image_data = item["pagemap"]["cse_image"]
+                if image_data and isinstance(image_data, list):
+                    image_url = image_data[0].get("src")
+            results.append(
+                {
+                    "title": item.get("title"),
+                    "url": item.get("link"),
+                    "image_url": image_url,
+                    "description": item.get("snippet", ""),
+                }
+            )
+        return results
+
+    def _make_search_call(self, query, max_results):
+        if max_results <= 0:
+            return []
+        cached = self.cache.get(query, max_results)
+        if cached is not None:
+            return cached
+
+        # All result pages are requested at once; the API caps `num` at 10 per call
+        num_pages = math.ceil(max_results / PER_REQUEST_RESULTS)
+        futures = [
+            self.executor.submit(
+                self._fetch_page, query, i * PER_REQUEST_RESULTS + 1,
+                min(PER_REQUEST_RESULTS, max_results - i * PER_REQUEST_RESULTS),
+            )
+            for i in range(num_pages)
+        ]
 
+        results = []
+        complete = True
+        for future in futures:
             try:
-                response = requests.get(search_url, params=params)
-                response.raise_for_status()
-                result_data = response.json()
-
-                items = result_data.get("items", [])
-                if not items:
-                    break
-
-                for item in items:
-                    title = item.get("title")
-                    url = item.get("link")
-                    description = item.get("snippet", "")
-                    image_url = None
-                    if "pagemap" in item and "cse_image" in item["pagemap"]:
-                        image_data = item["pagemap"]["cse_image"]
-                        if image_data and isinstance(image_data, list):
-                            image_url = image_data[0].get("src")
-                    # if self._is_url_accessible(url):
-                    results.append(
-                        {
-                            "title": title,
-                            "url": url,
-                            "image_url": image_url,
-                            "description": description,
-                        }
-                    )
+                items = future.result()
             except requests.RequestException as e:
-                print(f"Google Search API call failed: {e}")
-                return results
+                logger.error(f"Google Search API call failed: {e}")
+                complete = False
+                break
+            if not items:
+                break
+            results.extend(items)
 
+        results = results[:max_results]
+        if complete:
+            self.cache.put(query, max_results, results)
         return results
 
     def search(
         self, query, max_general_results, max_video_results, include_videos=False
     ):
         results = []
-        general_results = self._make_search_call(query, 15)
-        for item in general_results:
+        video_future = None
+        if include_videos:
+            video_future = self.search_executor.submit(
+                self._make_search_call, f"{query} site:youtube.com", max_video_results
+            )
+
+        for item in self._make_search_call(query, max_general_results):
             results.append(
                 {
                     "title": item["title"],
@@ -73,11 +156,8 @@ class GoogleSearch:
                 }
             )
 
-        if include_videos:
-            video_results = self._make_search_call(
-                f"{query} site:youtube.com", max_video_results
-            )
-            for item in video_results:
+        if video_future is not None:
+            for item in video_future.result():
                 results.append(
                     {
                         "title": item["title"],
@@ -91,7 +171,7 @@ class GoogleSearch:
 
     def _is_url_accessible(self, url, timeout=10):
         try:
-            response = requests.head(url, timeout=timeout, allow_redirects=True)
+            response = self.session.head(url, timeout=timeout, allow_redirects=True)
             return response.status_code == 200
         except requests.RequestException:
             return False
@@ -0,0 +1,190 @@
+"""
+Disk-backed cache of cleaned web page text keyed by URL and extraction profile.
+
+Text is stored content-addressed (`blobs/<sha256[:2]>/<sha256>.txt`), so URLs serving the
+same page share one file. A small sqlite table maps each URL to its content hash, HTTP
+validators (ETag / Last-Modified), fetch time and last access. Entries younger than the
+TTL are served without touching the network; older ones are revalidated with a
+conditional GET. The stored text depends on how the page was extracted (mode, text cap,
+extractor version), so each entry records its extraction profile and entries written under
+another profile are treated as misses: they are refetched in full, never revalidated with
+a 304 that would keep their stale text. The total size of the stored text is kept under `max_bytes` by evicting
+least recently used URLs.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from ...utils.logging import get_logger, setup_logger
+
+setup_logger()
+logger = get_logger("PageCache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    extraction TEXT,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class CachedPage:
+    url: str
+    text: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    def __init__(self, directory: str, extraction: str, ttl: float = 86400, max_bytes: int = 200_000_000):
+        """`extraction` identifies how cached text was produced; see `extraction_profile`."""
+        self.directory = directory
+        self.extraction = extraction
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(directory, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "pages.sqlite3"), check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        if "extraction" not in columns:
+            # Caches written before the profile was recorded: their entries never match
+            self._conn.execute("ALTER TABLE pages ADD COLUMN extraction TEXT")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blob_dir, content_hash[:2], f"{content_hash}.txt")
+
+    def _read_blob(self, content_hash: str) -> Optional[str]:
+        try:
+            with open(self._blob_path(content_hash), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_blob(self, content_hash: str, text: str) -> None:
+        path = self._blob_path(content_hash)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Cached page for `url` (fresh or stale), or None. Marks the URL as recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, etag, last_modified, fetched_at FROM pages WHERE url = ? AND extraction = ?",
+                (url, self.extraction),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            text = self._read_blob(row[0])
+            if text is None:
+                # Blob removed behind our back; forget the URL
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+            self.hits += 1
+        return CachedPage(url=url, text=text, content_hash=row[0], etag=row[1],
+                          last_modified=row[2], fetched_at=row[3])
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, CachedPage]:
+        pages = {}
+        for url in urls:
+            page = self.get(url)
+            if page is not None:
+                pages[url] = page
+        return pages
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._write_blob(content_hash, text)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, extraction, content_hash, size, etag, last_modified, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, self.extraction, content_hash, len(text.encode("utf-8")), etag, last_modified, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Record a successful revalidation (304): the cached text is fresh again."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ? AND extraction = ?",
+                (now, now, url, self.extraction))
+            self._conn.commit()
+
+    def _total_bytes(self) -> int:
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT content_hash, MAX(size) AS size FROM pages GROUP BY content_hash)"
+        ).fetchone()
+        return int(row[0])
+
+    def _evict(self) -> None:
+        # Must be called with the lock held
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT url, content_hash FROM pages ORDER BY last_access").fetchall()
+        evicted = 0
+        for url, content_hash in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            evicted += 1
+            still_used = self._conn.execute(
+                "SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone()
+            if still_used is None:
+                path = self._blob_path(content_hash)
+                try:
+                    total -= os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    total = self._total_bytes()
+        logger.info(f"[PageCache] Evicted {evicted} pages, {total} bytes cached")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            return {"pages": pages, "bytes": self._total_bytes(), "hits": self.hits, "misses": self.misses}
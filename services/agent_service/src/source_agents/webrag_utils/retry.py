@@ -1,4 +1,32 @@
+import asyncio
+import random
+import re
 import time
+from typing import Awaitable, Callable, List, Optional, Union
+
+from llama_index.core.utils import get_tokenizer
+
+from ...utils.logging import get_logger, setup_logger
+
+setup_logger()
+logger = get_logger("WebRAGRetry")
+
+# Context windows of the Groq models we use; unknown models fall back to the smallest
+MODEL_CONTEXT_LIMITS = {
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "meta-llama/llama-4-scout-17b-16e-instruct": 131072,
+    "meta-llama/llama-4-maverick-17b-128e-instruct": 131072,
+    "deepseek-r1-distill-llama-70b": 131072,
+    "qwen-qwq-32b": 131072,
+    "mistral-saba-24b": 32768,
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "gemma2-9b-it": 8192,
+}
+DEFAULT_CONTEXT_LIMIT = 8192
+# tiktoken undercounts Llama-family tokenizers by roughly 10-15%
+TOKEN_SAFETY_FACTOR = 1.15
 
 
 def reduce_context(
@@ -57,3 +85,101 @@ def retry_with_reduction_and_backoff(
                 raise RuntimeError(f"Unrecoverable error: {error_message}")
 
     raise RuntimeError(f"Failed after {max_retries} retries.")
+
+
+def count_tokens(text: str) -> int:
+    return int(len(get_tokenizer()(text)) * TOKEN_SAFETY_FACTOR) + 1
+
+
+def context_limit(model: str) -> int:
+    return MODEL_CONTEXT_LIMITS.get(model, DEFAULT_CONTEXT_LIMIT)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    tokens = get_tokenizer()(text)
+    keep = int(max_tokens / TOKEN_SAFETY_FACTOR)
+    if len(tokens) <= keep:
+        return text
+    # Approximate the cut in characters; the tokenizer's decode isn't exposed
+    return text[:int(len(text) * keep / len(tokens))]
+
+
+def fit_context(template: str, query: str, context: Union[str, List[str]], max_prompt_tokens: int):
+    """
+    Trim `context` once so the formatted prompt fits in `max_prompt_tokens`. List contexts
+    (ranked chunks) lose their lowest ranked chunks first; the last remaining chunk, or a
+    string context, is truncated.
+    """
+    overhead = count_tokens(template.format(context="", query=query))
+    budget = max_prompt_tokens - overhead
+    if budget <= 0:
+        raise RuntimeError("Prompt without context already exceeds the model's token budget.")
+
+    if isinstance(context, str):
+        return context if count_tokens(context) <= budget else truncate_to_tokens(context, budget)
+
+    # Chunks are rendered as a list, so each costs its own tokens plus quoting/separators
+    kept, used = [], 2
+    for chunk in context:
+        cost = count_tokens(chunk) + 4
+        if used + cost > budget:
+            if not kept:
+                kept.append(truncate_to_tokens(chunk, budget - used - 4))
+            break
+        kept.append(chunk)
+        used += cost
+    return kept
+
+
+_RETRY_IN = re.compile(r"try again in (?:(\d+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?", re.IGNORECASE)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the provider, from the retry-after header or the error message."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    match = _RETRY_IN.search(str(error))
+    if match and any(match.groups()):
+        minutes, seconds, millis = match.groups()
+        return float(minutes or 0) * 60 + float(seconds or 0) + float(millis or 0) / 1000
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    message = str(error)
+    return (
+        status in (429, 500, 502, 503, 504)
+        or "rate_limit_exceeded" in message
+    ) and not error_check_fn_request_too_large(message)
+
+
+async def aretry_with_backoff(
+    call_fn: Callable[[], Awaitable],
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+):
+    """
+    Await `call_fn()` until it succeeds, sleeping with full-jitter exponential backoff
+    between retryable failures. A provider supplied retry-after is honored as a minimum.
+    """
+    for attempt in range(max_retries):
+        try:
+            return await call_fn()
+        except Exception as e:
+            if not is_retryable(e) or attempt == max_retries - 1:
+                raise
+            backoff = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            requested = retry_after_seconds(e)
+            delay = max(backoff, requested + random.uniform(0, 0.25 * base_delay)) if requested else backoff
+            logger.warning(f"[WebRAGRetry] Attempt {attempt + 1} failed ({e}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
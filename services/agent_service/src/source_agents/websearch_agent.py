@@ -1,4 +1,5 @@
-import json, asyncio
+import json, asyncio, time
+from contextlib import aclosing
 from autogen_core import RoutedAgent, MessageContext, message_handler
 from ..protocols.message import Message
 
@@ -11,8 +12,11 @@ from .webrag_utils.config import (
     LLM_DEFAULT_MODEL, 
     TOP_K
 )
-from ..prompts.websearch_agent_prompt import websearch_assistant_prompt
+from ..prompts.websearch_agent_prompt import websearch_assistant_prompt, websearch_snippet_prompt
 from ..utils.logging import setup_logger, get_logger
+from ..utils.parsing import extract_json_with_brace_counting
+from ..utils.settings import settings
+from ..utils.text_similarity import relevant_text_chars
 from ..protocols.schemas import WebSearchMetadata,WebSearchResponse
 setup_logger()
 logger = get_logger("WebSearchAgent")
@@ -33,16 +37,83 @@ class WebSearchAgent(RoutedAgent):
         return results[:TOP_K]
 
 
-    def rag_pipeline(self, query, urls):
-        logger.info("[WebSearch] SCRAPPING DATA FROM URLS")
-        documents = self.scraper.fetch_data_from_urls(urls)
+    async def answer_from_snippets(self, query, metadata):
+        """
+        One LLM call over the search result titles and snippets. Returns (answer, snippets)
+        when the model judges the snippets sufficient, otherwise None. Each snippet is
+        numbered like metadata (from 1), so the answer's [n] citations refer to
+        metadata[n - 1], and carries its URL, so the returned sources stay attributable.
+        """
+        snippets = [
+            f"[{i}] {item.get('title') or ''}\n{item.get('url') or ''}\n{item.get('description') or ''}".strip()
+            for i, item in enumerate(metadata, start=1)
+        ]
+        if not any(item.get("description") for item in metadata):
+            return None
+        rag = RAG(model=LLM_DEFAULT_MODEL, use_chunk_store=False)
+        try:
+            content, used_snippets = await rag.aquery_llm(
+                query=query,
+                context=snippets,
+                template=websearch_snippet_prompt
+            )
+            result = extract_json_with_brace_counting(content)
+        except Exception as e:
+            logger.warning(f"[WebSearch] Snippet answer failed, falling back to scraping: {e}")
+            return None
+        answer = (result.get("answer") or "").strip()
+        if result.get("sufficient") is not True or not answer:
+            logger.info("[WebSearch] Snippets insufficient, falling back to scraping")
+            return None
+        logger.info("[WebSearch] Answered from search snippets")
+        return answer, used_snippets
+
+    async def _index_pages(self, rag, query, urls):
+        """
+        Index pages as they arrive. In progressive mode, stop as soon as enough relevant
+        text is indexed or the soft deadline passes with at least one page indexed;
+        leaving the scraper cancels the fetches still in flight.
+        """
+        loop = asyncio.get_running_loop()
+        progressive = settings.WEBRAG_PROGRESSIVE_ENABLED
+        soft_deadline = time.monotonic() + settings.WEBRAG_PROGRESSIVE_SOFT_DEADLINE
+        pages = chunks = relevant = 0
+
+        async with aclosing(self.scraper.iter_documents(urls)) as documents:
+            while True:
+                timeout = None
+                if progressive and pages:
+                    timeout = max(0.0, soft_deadline - time.monotonic())
+                try:
+                    document = await asyncio.wait_for(documents.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    logger.info(f"[WebSearch] Soft deadline reached after {pages} pages; answering")
+                    break
+
+                chunks += await loop.run_in_executor(None, rag.add_documents, [document])
+                pages += 1
+                relevant += relevant_text_chars(query, document.text)
+                if progressive and relevant >= settings.WEBRAG_PROGRESSIVE_MIN_RELEVANT_CHARS:
+                    logger.info(f"[WebSearch] {relevant} relevant chars from {pages} pages; answering")
+                    break
+        return pages, chunks
+
+    async def rag_pipeline(self, query, urls):
+        loop = asyncio.get_running_loop()
         rag = RAG(model=LLM_DEFAULT_MODEL)
         rag.set_llm("groq")
-        logger.info("[WebSearch] INDEXING DOCUMENTS")
-        rag.build_index(documents)
-        contexts = rag.query_index(query)
+        rag.start_index(result_urls=urls)
+
+        logger.info("[WebSearch] SCRAPPING AND INDEXING PAGES AS THEY ARRIVE")
+        pages, chunks = await self._index_pages(rag, query, urls)
+        logger.info(f"[WebSearch] Indexed {chunks} chunks from {pages}/{len(urls)} pages")
+
+        await loop.run_in_executor(None, rag.finalize_index)
+        contexts = await loop.run_in_executor(None, rag.query_index, query)
         logger.info("[WebSearch] RUNNING USER QUERY")
-        answer, used_context = rag.query_llm(
+        answer, used_context = await rag.aquery_llm(
             query=query,
             context=contexts,
             template=websearch_assistant_prompt
@@ -56,9 +127,15 @@ class WebSearchAgent(RoutedAgent):
             loop = asyncio.get_event_loop()
             logger.info("[WebSearch] Fetching URLs")
             metadata = await loop.run_in_executor(None, self.fetch_urls, query)
-            urls = [item.get("url") for item in metadata if item.get("url")]
-            logger.info("[WebSearch] BUILDING RAG OVER WEB URLS")
-            answer, context = await loop.run_in_executor(None, self.rag_pipeline, query, urls)
+            fast_answer = None
+            if settings.WEBRAG_SNIPPET_FAST_MODE:
+                fast_answer = await self.answer_from_snippets(query, metadata)
+            if fast_answer is not None:
+                answer, context = fast_answer
+            else:
+                urls = [item.get("url") for item in metadata if item.get("url")]
+                logger.info("[WebSearch] BUILDING RAG OVER WEB URLS")
+                answer, context = await self.rag_pipeline(query, urls)
             response = WebSearchResponse(
                 answer=answer,
                 sources=context,
@@ -0,0 +1,185 @@
+"""
+Process-wide embedding model registry.
+
+Each sentence-transformers model is loaded once per process and served by a single
+batching thread: concurrent `encode()` / `embed()` calls are queued and gathered into
+micro-batches (bounded by a max batch size and a max wait of a few ms) before one
+forward pass. Thin adapters expose the shared models through the LangChain
+(`Embeddings`) and LlamaIndex (`BaseEmbedding`) interfaces used across the service.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+
+from .logging import get_logger
+from .settings import settings
+
+logger = get_logger("EmbeddingRegistry")
+
+
+@dataclass
+class _EmbedRequest:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class EmbeddingModel:
+    """A shared sentence-transformers model with a micro-batching worker thread."""
+
+    def __init__(self, model_name: str, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.model = SentenceTransformer(model_name)
+        self._queue: "queue.Queue[_EmbedRequest]" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name=f"embed-{model_name}", daemon=True)
+        self._worker.start()
+        logger.info(f"[EmbeddingRegistry] Loaded embedding model: {model_name}")
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.texts)
+
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = self.model.encode(
+                    texts, batch_size=self.max_batch_size, convert_to_numpy=True)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                request.future.set_result(vectors[offset:offset + len(request.texts)])
+                offset += len(request.texts)
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Queue `texts` for the next micro-batch; the future resolves to an (n, dim) array."""
+        request = _EmbedRequest(texts=list(texts))
+        if not request.texts:
+            request.future.set_result(np.zeros((0, self.dimension), dtype=np.float32))
+        else:
+            self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: Sequence[str], normalize: bool = False) -> np.ndarray:
+        """Blocking, thread-safe embedding through the shared batcher."""
+        vectors = self.submit(texts).result()
+        return _normalize(vectors) if normalize else vectors
+
+    async def embed(self, texts: Sequence[str], normalize: bool = False) -> List[List[float]]:
+        """Async embedding; concurrent callers share forward passes."""
+        vectors = await asyncio.wrap_future(self.submit(texts))
+        return (_normalize(vectors) if normalize else vectors).tolist()
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+_registry: Dict[str, EmbeddingModel] = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_model(model_name: str) -> EmbeddingModel:
+    """Return the process-wide instance of `model_name`, loading it on first use."""
+    with _registry_lock:
+        model = _registry.get(model_name)
+        if model is None:
+            model = EmbeddingModel(
+                model_name,
+                max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+                max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+            )
+            _registry[model_name] = model
+        return model
+
+
+async def embed(model_name: str, texts: Sequence[str], normalize: bool = False) -> List[List[float]]:
+    """Embed `texts` with the shared `model_name` model."""
+    return await get_embedding_model(model_name).embed(texts, normalize=normalize)
+
+
+class RegistryLangchainEmbeddings(Embeddings):
+    """LangChain `Embeddings` backed by a shared model (same preprocessing as HuggingFaceEmbeddings)."""
+
+    def __init__(self, model_name: str, normalize: bool = False):
+        self.model_name = model_name
+        self.normalize = normalize
+        self._shared = get_embedding_model(model_name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [t.replace("\n", " ") for t in texts]
+        return self._shared.encode(texts, normalize=self.normalize).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [t.replace("\n", " ") for t in texts]
+        return await self._shared.embed(texts, normalize=self.normalize)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class RegistryLlamaIndexEmbedding(BaseEmbedding):
+    """LlamaIndex `BaseEmbedding` backed by a shared model (normalized like HuggingFaceEmbedding)."""
+
+    _shared: EmbeddingModel = PrivateAttr()
+    _normalize: bool = PrivateAttr()
+
+    def __init__(self, model_name: str, normalize: bool = True, **kwargs):
+        kwargs.setdefault("embed_batch_size", settings.EMBEDDING_MAX_BATCH_SIZE)
+        super().__init__(model_name=model_name, **kwargs)
+        self._shared = get_embedding_model(model_name)
+        self._normalize = normalize
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._shared.encode([query], normalize=self._normalize)[0].tolist()
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._shared.encode([text], normalize=self._normalize)[0].tolist()
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._shared.encode(texts, normalize=self._normalize).tolist()
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return (await self._shared.embed([query], normalize=self._normalize))[0]
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return (await self._shared.embed([text], normalize=self._normalize))[0]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self._shared.embed(texts, normalize=self._normalize)
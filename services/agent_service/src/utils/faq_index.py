@@ -0,0 +1,94 @@
+"""
+In-memory vector index over the precomputed FAQ table.
+
+The offline job (`python -m src.jobs.build_faq_index`) mines frequent questions from
+stored conversations and stores verified answers with their question embeddings. The
+manager looks incoming queries up here before planning, except for follow-ups in a session
+with history; a close enough match is answered directly and not stored as a conversation. Entries are tied to the KB index version they were built from, so re-ingesting
+the KB makes them stale until the job runs again.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..db.crud import get_faq_entries
+from ..source_agents.kb_utils.index import IndexVersionTracker
+from .embedding_registry import embed
+from .logging import get_logger, setup_logger
+from .settings import settings
+
+setup_logger()
+logger = get_logger("FAQIndex")
+
+FAQ_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+
+
+class FAQIndex:
+    def __init__(self, persist_directory: Optional[str] = None, threshold: float = 0.92,
+                 refresh_interval: float = 300.0):
+        persist_directory = persist_directory or os.getenv("CHROMA_DB_PATH")
+        self.version_tracker = IndexVersionTracker(persist_directory) if persist_directory else None
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._version: Optional[str] = None
+        self._loaded_at = 0.0
+
+    def _refresh(self) -> None:
+        """Reload entries when the KB index version changed or the refresh interval elapsed."""
+        if self.version_tracker is None:
+            return
+        version = self.version_tracker.current()
+        now = time.monotonic()
+        with self._lock:
+            if version == self._version and now - self._loaded_at < self.refresh_interval:
+                return
+        rows = get_faq_entries(version)
+        entries = [
+            {
+                "id": row.id,
+                "question": row.question,
+                "answer": row.answer,
+                "sources": row.sources or [],
+                "metadata": row.source_metadata or [],
+                "frequency": row.frequency,
+                "eval_score": row.eval_score,
+            }
+            for row in rows if row.embedding
+        ]
+        matrix = (np.asarray([row.embedding for row in rows if row.embedding], dtype=np.float32)
+                  if entries else np.zeros((0, 0), dtype=np.float32))
+        with self._lock:
+            if version != self._version:
+                logger.info(f"[FAQIndex] Loaded {len(entries)} FAQ entries for KB index version {version}")
+            self._entries, self._matrix = entries, matrix
+            self._version, self._loaded_at = version, now
+
+    async def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best FAQ entry for `query` with its similarity, or None below the threshold."""
+        await asyncio.to_thread(self._refresh)
+        with self._lock:
+            entries, matrix = self._entries, self._matrix
+        if not entries:
+            return None
+
+        vector = np.asarray(
+            (await embed(FAQ_EMBEDDING_MODEL, [query], normalize=True))[0], dtype=np.float32)
+        sims = matrix @ vector
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        return {**entries[best], "similarity": round(float(sims[best]), 4)}
+
+
+faq_index = FAQIndex(
+    threshold=settings.FAQ_MATCH_THRESHOLD,
+    refresh_interval=settings.FAQ_REFRESH_INTERVAL,
+)
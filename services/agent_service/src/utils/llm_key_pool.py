@@ -0,0 +1,259 @@
+"""
+Pool of Groq API keys shared by all agents.
+
+Every agent has its own Groq key, but a key hitting its per-minute token limit used to
+stall that agent while the other keys sat idle. The pool routes each chat completion to
+the key with the most headroom for the requested model, as reported by Groq's
+`x-ratelimit-*` response headers. The agent's own key wins ties. A key answering 429 is
+cooled down for its retry-after and the call moves on to the next key. Per-key usage is
+exposed through `metrics()`.
+
+`PooledLLMClient` mimics the subset of the OpenAI client the agents use
+(`client.chat.completions.create(...)`), so it is a drop-in replacement for the client
+returned by `create_llm_client`.
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from openai import OpenAI, RateLimitError
+
+from .logging import get_logger, setup_logger
+from .settings import settings
+
+setup_logger()
+logger = get_logger("LLMKeyPool")
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+# Environment variables holding Groq keys, by pool key name. WEBRAG_GROQ_API_KEY is left
+# out: WebRAG calls Groq through its own (async) clients, so the pool would never see that
+# key's usage and would keep routing agent calls to it as if it had full headroom.
+GROQ_KEY_ENV_VARS = {
+    "default": "GROQ_API_KEY",
+    "planner": "GROQ_API_KEY_PLANNER",
+    "planner_refiner": "GROQ_API_KEY_PLANNER_REFINER",
+    "kb": "GROQ_API_KEY_KB",
+    "executor": "GROQ_API_KEY_EXECUTOR",
+    "eval": "GROQ_API_KEY_EVAL",
+    "editor": "GROQ_API_KEY_EDITOR",
+}
+
+_DURATION = re.compile(r"(?:(\d+)h)?(?:(\d+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?$")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a Groq reset header ("7.66s", "2m59.56s", "450ms") or a plain number."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    match = _DURATION.match(value)
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, seconds, millis = match.groups()
+    return (float(hours or 0) * 3600 + float(minutes or 0) * 60
+            + float(seconds or 0) + float(millis or 0) / 1000)
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ModelQuota:
+    """Last known rate limit state of one key for one model."""
+    limit_requests: Optional[int] = None
+    limit_tokens: Optional[int] = None
+    remaining_requests: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    requests_reset_at: float = 0.0
+    tokens_reset_at: float = 0.0
+
+    def headroom(self, now: float) -> float:
+        """Fraction of the tightest limit still available; unknown or reset limits count as full."""
+        fractions = [1.0]
+        if self.limit_tokens and self.remaining_tokens is not None and now < self.tokens_reset_at:
+            fractions.append(self.remaining_tokens / self.limit_tokens)
+        if self.limit_requests and self.remaining_requests is not None and now < self.requests_reset_at:
+            fractions.append(self.remaining_requests / self.limit_requests)
+        return min(fractions)
+
+
+@dataclass
+class PooledKey:
+    name: str
+    client: OpenAI
+    quotas: Dict[str, ModelQuota] = field(default_factory=dict)
+    cooldown_until: float = 0.0
+    in_flight: int = 0
+    requests: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+
+
+class GroqKeyPool:
+    def __init__(self, api_keys: Dict[str, str], base_url: str = GROQ_BASE_URL, default_cooldown: float = 20.0):
+        self.default_cooldown = default_cooldown
+        self._lock = threading.Lock()
+        self.keys: List[PooledKey] = []
+        seen = {}
+        for name, api_key in api_keys.items():
+            if not api_key:
+                continue
+            if api_key in seen:
+                # Several agents configured with the same key share its quota
+                seen[api_key].name += f"+{name}"
+                continue
+            key = PooledKey(name=name, client=OpenAI(api_key=api_key, base_url=base_url))
+            seen[api_key] = key
+            self.keys.append(key)
+        if not self.keys:
+            raise ValueError("No Groq API keys configured for the key pool")
+
+    def _owns(self, key: PooledKey, preferred: Optional[str]) -> bool:
+        return preferred is not None and preferred in key.name.split("+")
+
+    def _select(self, model: str, preferred: Optional[str], exclude: set) -> Optional[PooledKey]:
+        # Must be called with the lock held
+        now = time.monotonic()
+        candidates = [k for k in self.keys if id(k) not in exclude and k.cooldown_until <= now]
+        if not candidates:
+            return None
+
+        def score(key: PooledKey):
+            headroom = key.quotas.get(model, ModelQuota()).headroom(now)
+            return (headroom - 0.05 * key.in_flight, self._owns(key, preferred))
+
+        return max(candidates, key=score)
+
+    def _update_quota(self, key: PooledKey, model: str, headers) -> None:
+        # Must be called with the lock held
+        if _int_header(headers, "x-ratelimit-remaining-tokens") is None:
+            return
+        now = time.monotonic()
+        quota = key.quotas.setdefault(model, ModelQuota())
+        quota.limit_requests = _int_header(headers, "x-ratelimit-limit-requests")
+        quota.limit_tokens = _int_header(headers, "x-ratelimit-limit-tokens")
+        quota.remaining_requests = _int_header(headers, "x-ratelimit-remaining-requests")
+        quota.remaining_tokens = _int_header(headers, "x-ratelimit-remaining-tokens")
+        quota.requests_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-requests")) or 60.0)
+        quota.tokens_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-tokens")) or 60.0)
+
+    def _cooldown_seconds(self, error: RateLimitError) -> float:
+        headers = getattr(error.response, "headers", None) or {}
+        for name in ("retry-after", "x-ratelimit-reset-tokens", "x-ratelimit-reset-requests"):
+            seconds = parse_duration(headers.get(name))
+            if seconds:
+                return seconds
+        return self.default_cooldown
+
+    def create(self, preferred: Optional[str] = None, **kwargs):
+        """`chat.completions.create(**kwargs)` on the key with the most headroom."""
+        model = kwargs.get("model", "")
+        tried = set()
+        last_error: Optional[Exception] = None
+        while True:
+            with self._lock:
+                key = self._select(model, preferred, tried)
+                if key is None:
+                    break
+                tried.add(id(key))
+                key.in_flight += 1
+                key.requests += 1
+
+            start = time.perf_counter()
+            try:
+                raw = key.client.chat.completions.with_raw_response.create(**kwargs)
+                response = raw.parse()
+            except RateLimitError as e:
+                cooldown = self._cooldown_seconds(e)
+                with self._lock:
+                    key.in_flight -= 1
+                    key.rate_limited += 1
+                    key.cooldown_until = time.monotonic() + cooldown
+                logger.warning(f"[LLMKeyPool] Key '{key.name}' rate limited on {model}; cooling down {cooldown:.1f}s")
+                last_error = e
+                continue
+            except Exception:
+                with self._lock:
+                    key.in_flight -= 1
+                    key.errors += 1
+                raise
+
+            usage = getattr(response, "usage", None)
+            with self._lock:
+                key.in_flight -= 1
+                key.latency_ms += (time.perf_counter() - start) * 1000
+                key.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+                key.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+                self._update_quota(key, model, raw.headers)
+            return response
+
+        if last_error is not None:
+            raise last_error
+        raise RuntimeError("All Groq API keys are cooling down after rate limits")
+
+    def metrics(self) -> List[Dict]:
+        """Per-key usage and last known quota; API keys themselves are never included."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "key": key.name,
+                    "requests": key.requests,
+                    "errors": key.errors,
+                    "rate_limited": key.rate_limited,
+                    "in_flight": key.in_flight,
+                    "prompt_tokens": key.prompt_tokens,
+                    "completion_tokens": key.completion_tokens,
+                    "avg_latency_ms": round(key.latency_ms / max(1, key.requests - key.errors - key.rate_limited), 1),
+                    "cooldown_remaining_s": round(max(0.0, key.cooldown_until - now), 1),
+                    "quotas": {
+                        model: {
+                            "remaining_tokens": quota.remaining_tokens,
+                            "limit_tokens": quota.limit_tokens,
+                            "remaining_requests": quota.remaining_requests,
+                            "limit_requests": quota.limit_requests,
+                            "headroom": round(quota.headroom(now), 3),
+                        }
+                        for model, quota in key.quotas.items()
+                    },
+                }
+                for key in self.keys
+            ]
+
+
+class PooledLLMClient:
+    """Drop-in for the OpenAI client: `client.chat.completions.create(...)` goes through the pool."""
+
+    def __init__(self, pool: GroqKeyPool, preferred: Optional[str] = None):
+        self.pool = pool
+        self.preferred = preferred
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        return self.pool.create(preferred=self.preferred, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def get_groq_key_pool() -> GroqKeyPool:
+    return GroqKeyPool(
+        {name: os.environ.get(env_var) for name, env_var in GROQ_KEY_ENV_VARS.items()},
+        default_cooldown=settings.GROQ_KEY_POOL_COOLDOWN,
+    )
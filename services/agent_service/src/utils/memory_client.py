@@ -3,6 +3,7 @@ import asyncio
 from typing import List
 from mem0 import Memory
 
+from ..utils.embedding_registry import RegistryLangchainEmbeddings
 from ..utils.logging import get_logger
 
 logger = get_logger("MemoryClient")
@@ -10,7 +11,7 @@ logger = get_logger("MemoryClient")
 # Ensure the Groq key is available
 os.environ["GROQ_API_KEY"] = os.getenv("GROQ_API_KEY")
 
-# Configure Memory with Groq LLM + HuggingFace embedder
+# Configure Memory with Groq LLM + the shared HuggingFace embedder from the registry
 _mem = Memory.from_config({
     "llm": {
         "provider": "groq",
@@ -21,9 +22,9 @@ _mem = Memory.from_config({
         }
     },
     "embedder": {
-        "provider": "huggingface",
+        "provider": "langchain",
         "config": {
-            "model": "multi-qa-MiniLM-L6-cos-v1"
+            "model": RegistryLangchainEmbeddings("multi-qa-MiniLM-L6-cos-v1")
         }
     },
     "vector_store": {
@@ -48,6 +48,14 @@ class Settings(BaseSettings):
         description="Default LLM model to use",
     )
     
+    # Embedding Settings
+    EMBEDDING_MAX_BATCH_SIZE: int = Field(
+        default=64, description="Maximum texts per embedding micro-batch"
+    )
+    EMBEDDING_MAX_WAIT_MS: float = Field(
+        default=5.0, description="Maximum time to wait for more texts before running an embedding batch"
+    )
+
     # WebRAG Settings
     WEBRAG_LLM_DEFAULT_MODEL: str = Field(
         default="llama-3.3-70b-versatile", description="Default LLM model for WebRAG"
@@ -81,6 +89,199 @@ class Settings(BaseSettings):
     WEBRAG_TOP_K: int = Field(
         default=3, description="Number of top results to consider"
     )
+    WEBRAG_FETCH_TIMEOUT: float = Field(
+        default=10.0, description="Per-request timeout in seconds when fetching web pages"
+    )
+    WEBRAG_FETCH_DEADLINE: float = Field(
+        default=15.0, description="Overall deadline in seconds for fetching all pages of a web search"
+    )
+    WEBRAG_FETCH_MAX_BYTES: int = Field(
+        default=2_000_000, description="Maximum bytes read from a single web page"
+    )
+    WEBRAG_FETCH_PER_HOST_LIMIT: int = Field(
+        default=2, description="Maximum concurrent requests to the same host"
+    )
+    WEBRAG_FETCH_MAX_CONNECTIONS: int = Field(
+        default=20, description="Size of the shared web fetching connection pool"
+    )
+    WEBRAG_PAGE_CACHE_ENABLED: bool = Field(
+        default=True, description="Cache cleaned web page text on disk"
+    )
+    WEBRAG_PAGE_CACHE_DIR: str = Field(
+        default="./webrag_page_cache", description="Directory of the web page cache"
+    )
+    WEBRAG_PAGE_CACHE_TTL: int = Field(
+        default=86400, description="Seconds a cached page is served before it is revalidated"
+    )
+    WEBRAG_PAGE_CACHE_MAX_BYTES: int = Field(
+        default=200_000_000, description="Maximum total size of cached page text in bytes"
+    )
+    WEBRAG_SEARCH_CACHE_TTL: int = Field(
+        default=3600, description="Seconds Google search results are cached"
+    )
+    WEBRAG_SEARCH_CACHE_MAX_ENTRIES: int = Field(
+        default=512, description="Maximum number of cached Google searches"
+    )
+    WEBRAG_EXTRACTION_MODE: str = Field(
+        default="main_content",
+        description="HTML extraction: 'main_content' (boilerplate stripped) or 'full' (whole page)",
+    )
+    WEBRAG_EXTRACT_MAX_BYTES: int = Field(
+        default=60_000, description="Maximum bytes of text extracted from a single web page"
+    )
+    WEBRAG_EXTRACT_WORKERS: int = Field(
+        default=2, description="Processes used for HTML extraction (0 extracts on the thread pool)"
+    )
+    WEBRAG_CHUNK_STORE_ENABLED: bool = Field(
+        default=True, description="Reuse embedded web page chunks across queries"
+    )
+    WEBRAG_CHUNK_STORE_DIR: str = Field(
+        default="./webrag_chunk_store", description="Directory of the persistent web chunk store"
+    )
+    WEBRAG_CHUNK_STORE_TTL: int = Field(
+        default=604800, description="Seconds stored web page chunks are kept"
+    )
+    WEBRAG_CHUNK_STORE_MAX_CHUNKS: int = Field(
+        default=5000, description="Maximum number of chunks in the web chunk store"
+    )
+    WEBRAG_MAX_PROMPT_TOKENS: int = Field(
+        default=6000, description="Token budget of a web search answer prompt (below the model context)"
+    )
+    WEBRAG_COMPLETION_TOKEN_RESERVE: int = Field(
+        default=1024, description="Tokens of the model context kept free for the answer"
+    )
+    WEBRAG_LLM_MAX_RETRIES: int = Field(
+        default=5, description="Attempts for a rate limited web search LLM call"
+    )
+    WEBRAG_PROGRESSIVE_ENABLED: bool = Field(
+        default=True, description="Answer web searches before every page is fetched"
+    )
+    WEBRAG_PROGRESSIVE_SOFT_DEADLINE: float = Field(
+        default=6.0, description="Seconds after which a web search answers from the pages indexed so far"
+    )
+    WEBRAG_PROGRESSIVE_MIN_RELEVANT_CHARS: int = Field(
+        default=3000, description="Indexed query-relevant characters after which a web search answers early"
+    )
+    WEBRAG_DEDUP_ENABLED: bool = Field(
+        default=True, description="Drop near-duplicate web pages and chunks before embedding"
+    )
+    WEBRAG_DEDUP_THRESHOLD: float = Field(
+        default=0.8, description="Estimated shingle Jaccard similarity at which pages/chunks count as duplicates"
+    )
+    WEBRAG_SNIPPET_FAST_MODE: bool = Field(
+        default=True, description="Try answering from search result snippets before scraping pages"
+    )
+    WEBRAG_RETRIEVAL_MODE: str = Field(
+        default="adaptive",
+        description="Web RAG retrieval: 'hybrid' (BM25 + embeddings), 'bm25' (no embeddings) or 'adaptive'",
+    )
+    WEBRAG_ADAPTIVE_EMBED_MIN_CHUNKS: int = Field(
+        default=200,
+        description="In adaptive mode, freshly scraped chunks above which web pages are embedded for vector search "
+                    "(below it the index is BM25-only and stored chunks stay unembedded until a vector search uses them)",
+    )
+
+    # Knowledge Base Settings
+    KB_SUBQUESTION_CONCURRENCY: int = Field(
+        default=3, description="Maximum sub-questions of a ReSP hop processed concurrently"
+    )
+    KB_CPU_WORKERS: int = Field(
+        default=4, description="Worker threads for KB retrieval and reranking"
+    )
+    KB_FUSED_SUMMARIZATION: bool = Field(
+        default=True, description="Produce global and local ReSP summaries from a single LLM call"
+    )
+    KB_SUBQUESTION_DEDUP_THRESHOLD: float = Field(
+        default=0.9, description="Cosine similarity above which a new ReSP sub-question is merged into an earlier one"
+    )
+    KB_POOL_SUMMARIZED_PENALTY: float = Field(
+        default=2.0, description="Reranker logit penalty for chunks an earlier sub-question of the request already summarized"
+    )
+    KB_SINGLE_HOP_FAST_PATH: bool = Field(
+        default=True, description="Skip the planner-reasoner when hop-1 evidence is conclusive"
+    )
+    KB_SINGLE_HOP_CONFIDENCE_THRESHOLD: float = Field(
+        default=0.8, description="Hop-1 confidence (0-1) required to take the single-hop fast path"
+    )
+    KB_RERANKER_BACKEND: str = Field(
+        default="torch", description="Cross-encoder reranker backend: 'torch' (fp32) or 'onnx' (int8)"
+    )
+    KB_RERANKER_MODEL: str = Field(
+        default="BAAI/bge-reranker-base", description="Cross-encoder reranker model"
+    )
+    KB_RERANKER_MAX_LENGTH: int = Field(
+        default=512, description="Maximum token length of a (query, chunk) pair"
+    )
+    KB_RERANKER_BATCH_SIZE: int = Field(
+        default=16, description="Pairs per length-bucketed reranker batch"
+    )
+    KB_RERANKER_THREADS: int = Field(
+        default=0, description="Intra-op threads for the reranker (0 = runtime default)"
+    )
+    KB_RERANKER_ONNX_DIR: str = Field(
+        default="hf_cache/onnx", description="Directory holding exported quantized ONNX rerankers"
+    )
+    KB_RERANK_BATCH_MAX_PAIRS: int = Field(
+        default=64, description="Maximum (query, chunk) pairs the rerank service batches into one call"
+    )
+    KB_RERANK_BATCH_MAX_WAIT_MS: float = Field(
+        default=5.0, description="Maximum milliseconds the rerank service waits to fill a batch"
+    )
+    KB_RERANK_CACHE_SIZE: int = Field(
+        default=20000, description="Maximum cached (query, chunk) reranker scores"
+    )
+    KB_RETRIEVAL_K: int = Field(
+        default=15, description="Chunks retrieved from Chroma per sub-question before reranking"
+    )
+    CHROMA_HNSW_SPACE: str = Field(
+        default="l2", description="HNSW distance metric of the KB index: 'l2', 'cosine' or 'ip' (creation time only)"
+    )
+    CHROMA_HNSW_M: int = Field(
+        default=16, description="HNSW graph degree of the KB index (creation time only)"
+    )
+    CHROMA_HNSW_CONSTRUCTION_EF: int = Field(
+        default=100, description="HNSW construction ef of the KB index (creation time only)"
+    )
+    CHROMA_HNSW_SEARCH_EF: int = Field(
+        default=64, description="HNSW query-time ef for KB retrieval; higher trades latency for recall"
+    )
+    KB_INDEX_VERSION_CHECK_INTERVAL: float = Field(
+        default=30.0, description="Seconds between checks of the KB index version"
+    )
+    KB_PREFILTER_MIN_RESULTS: int = Field(
+        default=3, description="Minimum chunks a metadata-filtered search must return before falling back to unfiltered search"
+    )
+
+    # FAQ Settings
+    FAQ_ENABLED: bool = Field(
+        default=True, description="Answer close matches of precomputed FAQ entries before planning"
+    )
+    FAQ_MATCH_THRESHOLD: float = Field(
+        default=0.92, description="Cosine similarity a query needs to an FAQ question to be answered from it"
+    )
+    FAQ_REFRESH_INTERVAL: float = Field(
+        default=300.0, description="Seconds between reloads of the FAQ table"
+    )
+    FAQ_CLUSTER_THRESHOLD: float = Field(
+        default=0.88, description="Cosine similarity for grouping stored questions into one FAQ cluster"
+    )
+    FAQ_MIN_FREQUENCY: int = Field(
+        default=5, description="Stored conversations a question cluster needs to become an FAQ entry"
+    )
+    FAQ_MAX_ENTRIES: int = Field(
+        default=50, description="Maximum FAQ entries built by the offline job"
+    )
+    FAQ_MIN_EVAL_SCORE: float = Field(
+        default=0.9, description="Minimum fact-check score for a precomputed FAQ answer to be stored"
+    )
+
+    # LLM Key Pool Settings
+    GROQ_KEY_POOL_ENABLED: bool = Field(
+        default=True, description="Route Groq calls of all agents through a shared pool of their API keys"
+    )
+    GROQ_KEY_POOL_COOLDOWN: float = Field(
+        default=20.0, description="Seconds a rate limited key is skipped when Groq sends no retry-after"
+    )
 
     # Cache Settings
     CACHE_TTL: int = Field(default=3600, description="Cache time-to-live in seconds")
@@ -103,6 +304,19 @@ class Settings(BaseSettings):
     ENABLE_EVALUATION: bool = Field(default=True, description="Enable evaluation agent")
     ENABLE_EDITING: bool = Field(default=True, description="Enable editing agent")
 
+    # Executor Settings
+    EXECUTOR_AGREEMENT_THRESHOLD: float = Field(
+        default=0.75,
+        description="Answer similarity above which source answers are merged locally instead of by the LLM",
+    )
+    EXECUTOR_SAME_QUESTION_THRESHOLD: float = Field(
+        default=0.8,
+        description="Sub-query similarity above which parallel sub-queries count as the same question",
+    )
+    EXECUTOR_EXTRACTIVE_MAX_SENTENCES: int = Field(
+        default=12, description="Maximum sentences kept by the extractive (MMR) answer merge"
+    )
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -149,6 +363,10 @@ LOG_FORMAT = settings.LOG_FORMAT
 # Model Settings
 DEFAULT_MODEL = settings.DEFAULT_MODEL
 
+# Embedding Settings
+EMBEDDING_MAX_BATCH_SIZE = settings.EMBEDDING_MAX_BATCH_SIZE
+EMBEDDING_MAX_WAIT_MS = settings.EMBEDDING_MAX_WAIT_MS
+
 # WebRAG Settings
 WEBRAG_LLM_DEFAULT_MODEL = settings.WEBRAG_LLM_DEFAULT_MODEL
 WEBRAG_EMBED_DEFAULT_MODEL = settings.WEBRAG_EMBED_DEFAULT_MODEL
@@ -160,6 +378,73 @@ WEBRAG_MAX_SEARCH_RESULTS = settings.WEBRAG_MAX_SEARCH_RESULTS
 WEBRAG_MAX_VIDEO_RESULTS = settings.WEBRAG_MAX_VIDEO_RESULTS
 WEBRAG_MAX_GENERAL_RESULTS = settings.WEBRAG_MAX_GENERAL_RESULTS
 WEBRAG_TOP_K = settings.WEBRAG_TOP_K
+WEBRAG_FETCH_TIMEOUT = settings.WEBRAG_FETCH_TIMEOUT
+WEBRAG_FETCH_DEADLINE = settings.WEBRAG_FETCH_DEADLINE
+WEBRAG_FETCH_MAX_BYTES = settings.WEBRAG_FETCH_MAX_BYTES
+WEBRAG_FETCH_PER_HOST_LIMIT = settings.WEBRAG_FETCH_PER_HOST_LIMIT
+WEBRAG_FETCH_MAX_CONNECTIONS = settings.WEBRAG_FETCH_MAX_CONNECTIONS
+WEBRAG_PAGE_CACHE_ENABLED = settings.WEBRAG_PAGE_CACHE_ENABLED
+WEBRAG_PAGE_CACHE_DIR = settings.WEBRAG_PAGE_CACHE_DIR
+WEBRAG_PAGE_CACHE_TTL = settings.WEBRAG_PAGE_CACHE_TTL
+WEBRAG_PAGE_CACHE_MAX_BYTES = settings.WEBRAG_PAGE_CACHE_MAX_BYTES
+WEBRAG_SEARCH_CACHE_TTL = settings.WEBRAG_SEARCH_CACHE_TTL
+WEBRAG_SEARCH_CACHE_MAX_ENTRIES = settings.WEBRAG_SEARCH_CACHE_MAX_ENTRIES
+WEBRAG_EXTRACTION_MODE = settings.WEBRAG_EXTRACTION_MODE
+WEBRAG_EXTRACT_MAX_BYTES = settings.WEBRAG_EXTRACT_MAX_BYTES
+WEBRAG_EXTRACT_WORKERS = settings.WEBRAG_EXTRACT_WORKERS
+WEBRAG_CHUNK_STORE_ENABLED = settings.WEBRAG_CHUNK_STORE_ENABLED
+WEBRAG_CHUNK_STORE_DIR = settings.WEBRAG_CHUNK_STORE_DIR
+WEBRAG_CHUNK_STORE_TTL = settings.WEBRAG_CHUNK_STORE_TTL
+WEBRAG_CHUNK_STORE_MAX_CHUNKS = settings.WEBRAG_CHUNK_STORE_MAX_CHUNKS
+WEBRAG_MAX_PROMPT_TOKENS = settings.WEBRAG_MAX_PROMPT_TOKENS
+WEBRAG_COMPLETION_TOKEN_RESERVE = settings.WEBRAG_COMPLETION_TOKEN_RESERVE
+WEBRAG_LLM_MAX_RETRIES = settings.WEBRAG_LLM_MAX_RETRIES
+WEBRAG_PROGRESSIVE_ENABLED = settings.WEBRAG_PROGRESSIVE_ENABLED
+WEBRAG_PROGRESSIVE_SOFT_DEADLINE = settings.WEBRAG_PROGRESSIVE_SOFT_DEADLINE
+WEBRAG_PROGRESSIVE_MIN_RELEVANT_CHARS = settings.WEBRAG_PROGRESSIVE_MIN_RELEVANT_CHARS
+WEBRAG_DEDUP_ENABLED = settings.WEBRAG_DEDUP_ENABLED
+WEBRAG_DEDUP_THRESHOLD = settings.WEBRAG_DEDUP_THRESHOLD
+WEBRAG_SNIPPET_FAST_MODE = settings.WEBRAG_SNIPPET_FAST_MODE
+WEBRAG_RETRIEVAL_MODE = settings.WEBRAG_RETRIEVAL_MODE
+WEBRAG_ADAPTIVE_EMBED_MIN_CHUNKS = settings.WEBRAG_ADAPTIVE_EMBED_MIN_CHUNKS
+
+# Knowledge Base Settings
+KB_SUBQUESTION_CONCURRENCY = settings.KB_SUBQUESTION_CONCURRENCY
+KB_CPU_WORKERS = settings.KB_CPU_WORKERS
+KB_FUSED_SUMMARIZATION = settings.KB_FUSED_SUMMARIZATION
+KB_SUBQUESTION_DEDUP_THRESHOLD = settings.KB_SUBQUESTION_DEDUP_THRESHOLD
+KB_POOL_SUMMARIZED_PENALTY = settings.KB_POOL_SUMMARIZED_PENALTY
+KB_SINGLE_HOP_FAST_PATH = settings.KB_SINGLE_HOP_FAST_PATH
+KB_SINGLE_HOP_CONFIDENCE_THRESHOLD = settings.KB_SINGLE_HOP_CONFIDENCE_THRESHOLD
+KB_RERANKER_BACKEND = settings.KB_RERANKER_BACKEND
+KB_RERANKER_MODEL = settings.KB_RERANKER_MODEL
+KB_RERANKER_MAX_LENGTH = settings.KB_RERANKER_MAX_LENGTH
+KB_RERANKER_BATCH_SIZE = settings.KB_RERANKER_BATCH_SIZE
+KB_RERANKER_THREADS = settings.KB_RERANKER_THREADS
+KB_RERANKER_ONNX_DIR = settings.KB_RERANKER_ONNX_DIR
+KB_RERANK_BATCH_MAX_PAIRS = settings.KB_RERANK_BATCH_MAX_PAIRS
+KB_RERANK_BATCH_MAX_WAIT_MS = settings.KB_RERANK_BATCH_MAX_WAIT_MS
+KB_RERANK_CACHE_SIZE = settings.KB_RERANK_CACHE_SIZE
+KB_RETRIEVAL_K = settings.KB_RETRIEVAL_K
+CHROMA_HNSW_SPACE = settings.CHROMA_HNSW_SPACE
+CHROMA_HNSW_M = settings.CHROMA_HNSW_M
+CHROMA_HNSW_CONSTRUCTION_EF = settings.CHROMA_HNSW_CONSTRUCTION_EF
+CHROMA_HNSW_SEARCH_EF = settings.CHROMA_HNSW_SEARCH_EF
+KB_INDEX_VERSION_CHECK_INTERVAL = settings.KB_INDEX_VERSION_CHECK_INTERVAL
+KB_PREFILTER_MIN_RESULTS = settings.KB_PREFILTER_MIN_RESULTS
+
+# FAQ Settings
+FAQ_ENABLED = settings.FAQ_ENABLED
+FAQ_MATCH_THRESHOLD = settings.FAQ_MATCH_THRESHOLD
+FAQ_REFRESH_INTERVAL = settings.FAQ_REFRESH_INTERVAL
+FAQ_CLUSTER_THRESHOLD = settings.FAQ_CLUSTER_THRESHOLD
+FAQ_MIN_FREQUENCY = settings.FAQ_MIN_FREQUENCY
+FAQ_MAX_ENTRIES = settings.FAQ_MAX_ENTRIES
+FAQ_MIN_EVAL_SCORE = settings.FAQ_MIN_EVAL_SCORE
+
+# LLM Key Pool Settings
+GROQ_KEY_POOL_ENABLED = settings.GROQ_KEY_POOL_ENABLED
+GROQ_KEY_POOL_COOLDOWN = settings.GROQ_KEY_POOL_COOLDOWN
 
 # Cache Settings
 CACHE_TTL = settings.CACHE_TTL
@@ -178,12 +463,25 @@ CORS_ORIGINS = settings.CORS_ORIGINS
 ENABLE_EVALUATION = settings.ENABLE_EVALUATION
 ENABLE_EDITING = settings.ENABLE_EDITING
 
+# Executor Settings
+EXECUTOR_AGREEMENT_THRESHOLD = settings.EXECUTOR_AGREEMENT_THRESHOLD
+EXECUTOR_SAME_QUESTION_THRESHOLD = settings.EXECUTOR_SAME_QUESTION_THRESHOLD
+EXECUTOR_EXTRACTIVE_MAX_SENTENCES = settings.EXECUTOR_EXTRACTIVE_MAX_SENTENCES
+
 
 GOOGLE_SERVICE_ACCOUNT_FILE = settings.GOOGLE_SERVICE_ACCOUNT_FILE
 KB_PROCESSED_FILES = settings.KB_PROCESSED_FILES
 KB_DATA_STORAGE_DRIVE_ID= settings.KB_DATA_STORAGE_DRIVE_ID
 
 
+def _pooled_groq_client(agent_name: str):
+    """Client routing through the shared Groq key pool, preferring the agent's own key."""
+    from .llm_key_pool import GROQ_KEY_ENV_VARS, PooledLLMClient, get_groq_key_pool
+
+    preferred = agent_name if agent_name in GROQ_KEY_ENV_VARS else "default"
+    return PooledLLMClient(get_groq_key_pool(), preferred=preferred)
+
+
 def create_llm_client(agent_name: str = "default"):
     """
     Create an LLM client (OpenAI or Groq) based on environment variables.
@@ -219,6 +517,9 @@ def create_llm_client(agent_name: str = "default"):
         if not api_key:
             raise ValueError(f"{groq_key_env} or GROQ_API_KEY environment variable is required")
         
+        if settings.GROQ_KEY_POOL_ENABLED:
+            return _pooled_groq_client(agent_name), "meta-llama/llama-4-scout-17b-16e-instruct"
+
         return OpenAI(
             api_key=api_key,
             base_url="https://api.groq.com/openai/v1"
@@ -263,6 +564,9 @@ def create_light_llm_client(agent_name: str = "default"):
             raise ValueError(
                 f"{groq_key_env} or GROQ_API_KEY environment variable is required")
 
+        if settings.GROQ_KEY_POOL_ENABLED:
+            return _pooled_groq_client(agent_name), "qwen/qwen3-32b"
+
         return OpenAI(
             api_key=api_key,
             base_url="https://api.groq.com/openai/v1"
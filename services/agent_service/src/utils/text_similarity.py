@@ -0,0 +1,130 @@
+"""
+Lightweight lexical similarity helpers.
+Used where loading an embedding model would cost more than the decision it informs
+(e.g. checking whether two source answers already agree).
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_CITATION_RE = re.compile(r"\[\d+\]")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "been", "but", "by", "can", "do",
+    "does", "for", "from", "has", "have", "how", "i", "if", "in", "into", "is",
+    "it", "its", "of", "on", "or", "so", "such", "than", "that", "the", "their",
+    "then", "there", "these", "this", "those", "to", "was", "were", "what",
+    "when", "which", "while", "who", "will", "with", "would", "you", "your",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase content tokens with citations and stopwords removed."""
+    if not text:
+        return []
+    text = _CITATION_RE.sub(" ", text.lower())
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+def term_vector(text: str) -> Counter:
+    """Bag-of-words term frequency vector for `text`."""
+    return Counter(tokenize(text))
+
+
+def cosine_similarity(a: Dict[str, int], b: Dict[str, int]) -> float:
+    """Cosine similarity between two sparse term vectors."""
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(v * b.get(k, 0) for k, v in a.items())
+    if not dot:
+        return 0.0
+    norm_a = math.sqrt(sum(v * v for v in a.values()))
+    norm_b = math.sqrt(sum(v * v for v in b.values()))
+    return dot / (norm_a * norm_b)
+
+
+def text_similarity(a: str, b: str) -> float:
+    """Cosine similarity between the term vectors of two texts."""
+    return cosine_similarity(term_vector(a), term_vector(b))
+
+
+def relevant_text_chars(query: str, text: str, min_coverage: float = 0.5) -> int:
+    """Characters of `text` in lines mentioning at least `min_coverage` of the query's terms."""
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return len(text)
+    total = 0
+    for line in text.splitlines():
+        if len(query_terms & set(tokenize(line))) >= min_coverage * len(query_terms):
+            total += len(line)
+    return total
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into non-empty sentences (code fences are kept whole)."""
+    if not text:
+        return []
+    if "```" in text:
+        # Don't break code blocks apart; treat each fenced block as one unit
+        parts = re.split(r"(```.*?```)", text, flags=re.S)
+        sentences = []
+        for part in parts:
+            if part.startswith("```"):
+                sentences.append(part.strip())
+            else:
+                sentences.extend(split_sentences(part))
+        return [s for s in sentences if s]
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def pairwise_similarity_matrix(texts: Sequence[str]) -> List[List[float]]:
+    """Symmetric matrix of pairwise text similarities (diagonal is 1.0)."""
+    vectors = [term_vector(t) for t in texts]
+    n = len(vectors)
+    matrix = [[1.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            sim = cosine_similarity(vectors[i], vectors[j])
+            matrix[i][j] = matrix[j][i] = sim
+    return matrix
+
+
+def mmr_select(
+    query: str,
+    candidates: Sequence[str],
+    k: int,
+    lambda_mult: float = 0.7,
+) -> List[int]:
+    """
+    Maximal Marginal Relevance selection.
+    Returns indices of up to `k` candidates balancing relevance to `query`
+    against redundancy with already selected candidates.
+    """
+    if not candidates or k <= 0:
+        return []
+
+    query_vec = term_vector(query)
+    cand_vecs = [term_vector(c) for c in candidates]
+    relevance = [cosine_similarity(query_vec, v) for v in cand_vecs]
+
+    selected: List[int] = []
+    remaining = list(range(len(candidates)))
+    while remaining and len(selected) < k:
+        best_idx, best_score = None, float("-inf")
+        for idx in remaining:
+            redundancy = max(
+                (cosine_similarity(cand_vecs[idx], cand_vecs[s]) for s in selected),
+                default=0.0,
+            )
+            score = lambda_mult * relevance[idx] - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best_idx, best_score = idx, score
+        selected.append(best_idx)
+        remaining.remove(best_idx)
+    return selected
@@ -1,10 +1,14 @@
 
 import os
+import json
 import tempfile
+import time
+import uuid
 import logging
 from pathlib import Path
 from typing import List, Dict, Set
 from dataclasses import dataclass
+from functools import lru_cache
 from pptx import Presentation
 from pydrive2.auth import GoogleAuth
 from pydrive2.drive import GoogleDrive
@@ -103,27 +107,105 @@ def split_documents(documents: List[Dict], chunk_size: int = 300) -> List:
         raise DriveIngestionError(f"Semantic splitting failed: {str(e)}")
 
 
+@lru_cache(maxsize=1)
 def get_embedding_model() -> HuggingFaceEmbeddings:
-    """Initialize the embedding model"""
+    """Initialize the embedding model once per process (shared by chunking and storage)"""
     try:
         return HuggingFaceEmbeddings(model_name='BAAI/bge-small-en-v1.5')
     except Exception as e:
         logger.error(f"Failed to initialize embedding model: {str(e)}")
         raise DriveIngestionError("Embedding model initialization failed")
 
+def get_hnsw_metadata() -> Dict[str, object]:
+    """
+    HNSW index parameters for the Chroma collection, from CHROMA_HNSW_* env variables.
+    They only apply when the collection is created; changing space/M/construction_ef on an
+    existing index requires re-ingesting into a fresh CHROMA_DB_PATH.
+    """
+    return {
+        "hnsw:space": os.getenv("CHROMA_HNSW_SPACE", "l2"),
+        "hnsw:M": int(os.getenv("CHROMA_HNSW_M", "16")),
+        "hnsw:construction_ef": int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "100")),
+        "hnsw:search_ef": int(os.getenv("CHROMA_HNSW_SEARCH_EF", "64")),
+    }
+
+def apply_search_ef(collection, search_ef: int) -> None:
+    """
+    Set the query-time HNSW ef on an existing collection. Unlike the other HNSW parameters
+    it can change after creation; the agent service applies its own CHROMA_HNSW_SEARCH_EF too.
+    """
+    if (collection.metadata or {}).get("hnsw:search_ef") == search_ef:
+        return
+    try:
+        collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+    except Exception:
+        metadata = dict(collection.metadata or {})
+        metadata["hnsw:search_ef"] = search_ef
+        collection.modify(metadata=metadata)
+    logger.info(f"Set hnsw search_ef={search_ef} on the KB collection")
+
 def store_embeddings(docs: List, embedding_model: HuggingFaceEmbeddings, persist_directory: str) -> None:
     """Store document embeddings in ChromaDB"""
     try:
+        hnsw_metadata = get_hnsw_metadata()
         db = Chroma.from_documents(
             documents=docs,
             embedding=embedding_model,
-            persist_directory=persist_directory
+            persist_directory=persist_directory,
+            collection_metadata=hnsw_metadata
         )
+        apply_search_ef(db._collection, hnsw_metadata["hnsw:search_ef"])
         db.persist()
     except Exception as e:
         logger.error(f"Failed to store embeddings: {str(e)}")
         raise DriveIngestionError(f"Embedding storage failed: {str(e)}")
 
+METADATA_INDEX_FILENAME = "metadata_index.json"
+INDEX_VERSION_FILENAME = "index_version.txt"
+
+def write_index_version(persist_directory: str) -> None:
+    """
+    Write a new version marker next to the index. The agent service keys its rerank score
+    cache and FAQ entries on it, so it changes exactly when ingestion changes the index.
+    """
+    path = os.path.join(persist_directory, INDEX_VERSION_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f"{time.time_ns()}-{uuid.uuid4().hex[:8]}")
+    os.replace(tmp_path, path)
+
+
+def update_metadata_index(docs: List, persist_directory: str) -> None:
+    """
+    Fold chunk metadata (source, section, page) into the metadata index stored next to
+    the Chroma index. The agent service uses it to pre-filter retrieval by document/section.
+    """
+    try:
+        index_path = os.path.join(persist_directory, METADATA_INDEX_FILENAME)
+        sources = {}
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                sources = json.load(f).get("sources", {})
+
+        for doc in docs:
+            meta = doc.metadata or {}
+            if not meta.get("source"):
+                continue
+            entry = sources.setdefault(meta["source"], {"title": None, "sections": [], "pages": []})
+            entry["title"] = entry.get("title") or meta.get("title")
+            section = meta.get("section") or meta.get("section_title")
+            if section and section not in entry["sections"]:
+                entry["sections"].append(section)
+            page = meta.get("page")
+            if isinstance(page, int) and page not in entry["pages"]:
+                entry["pages"].append(page)
+
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump({"sources": sources}, f, indent=2)
+    except Exception as e:
+        logger.error(f"Failed to update metadata index: {str(e)}")
+        raise DriveIngestionError(f"Metadata index update failed: {str(e)}")
+
 def load_processed_set(tracker_txt: str) -> Set[str]:
     """Load set of already processed files"""
     try:
@@ -238,6 +320,8 @@ def process_drive_folder(
 
                     logger.info(f"Storing embeddings for: {file_name}")
                     store_embeddings(chunks, embedding_model, persist_directory)
+                    update_metadata_index(chunks, persist_directory)
+                    write_index_version(persist_directory)
 
                     if not force_reprocess:
                         mark_as_processed(file_name, tracker_txt)